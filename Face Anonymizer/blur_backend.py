@@ -1,49 +1,238 @@
-import cv2
-import mediapipe as mp
 import argparse
 import tempfile
 import os
-import numpy as np
+
+from detectors import DETECTORS, FaceDetector, create_detector
+from encoders import ENCODERS, create_encoder
+from ingest import DETECT_MAX_SIDE, decode_image, encoded_buffer, reduction_factor, scale_boxes
+
+# cv2 and numpy are imported inside the functions that use them, so --help, CLI errors
+# and the frontend's first render don't pay for them (and imports stay thread-safe)
+
+
+def output_path_for(input_path):
+    """Derive an output path by appending "_o" before the extension"""
+    dirname, filename = os.path.split(input_path)
+    name, ext = os.path.splitext(filename)
+    return os.path.join(dirname or ".", f"{name}_o{ext}")
+
+
+def clip_boxes(boxes, frame_shape):
+    """Clip boxes to the frame and drop empty ones (detections can extend past the edges)"""
+    import numpy as np
+
+    H, W = frame_shape[:2]
+    boxes = boxes.copy()
+    boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, W)
+    boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, H)
+    return boxes[(boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])]
+
+
+def blur_boxes(frame, boxes, blur_intensity):
+    """Blur each box of the frame in place"""
+    import cv2
+
+    ksize = max(1, int(blur_intensity))
+    for x1, y1, x2, y2 in boxes.tolist():
+        frame[y1:y2, x1:x2] = cv2.blur(frame[y1:y2, x1:x2], (ksize, ksize))
+    return frame
+
+
+COMPOSITE_STRATEGIES = ['auto', 'per_box', 'single_pass']
+
+# Cost model for choosing a compositing strategy, in pixel-equivalents measured on
+# 1080p frames: each per-box blur call costs about as much as blurring 4000 pixels,
+# and a single pass (blur + mask + copy) costs about 1.8x its region's pixel count.
+CALL_OVERHEAD_PX = 4000
+SINGLE_PASS_FACTOR = 1.8
+
+
+def merge_boxes(boxes):
+    """Replace each group of overlapping boxes with their union box, so no pixel is blurred twice"""
+    import numpy as np
+
+    boxes = np.asarray(boxes, dtype=np.int32)
+    while len(boxes) > 1:
+        overlap = ((boxes[:, None, 0] < boxes[None, :, 2]) & (boxes[None, :, 0] < boxes[:, None, 2]) &
+                   (boxes[:, None, 1] < boxes[None, :, 3]) & (boxes[None, :, 1] < boxes[:, None, 3]))
+        pairs = np.argwhere(np.triu(overlap, 1))
+        if len(pairs) == 0:
+            break
+
+        # Union-find over the overlapping pairs
+        parent = list(range(len(boxes)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j in pairs.tolist():
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[root_j] = root_i
+
+        _, group = np.unique([find(i) for i in range(len(boxes))], return_inverse=True)
+        merged = np.empty((group.max() + 1, 4), dtype=np.int32)
+        merged[:, :2] = np.iinfo(np.int32).max
+        merged[:, 2:] = np.iinfo(np.int32).min
+        np.minimum.at(merged[:, 0], group, boxes[:, 0])
+        np.minimum.at(merged[:, 1], group, boxes[:, 1])
+        np.maximum.at(merged[:, 2], group, boxes[:, 2])
+        np.maximum.at(merged[:, 3], group, boxes[:, 3])
+        # Union boxes can overlap boxes they did not touch before, so repeat
+        boxes = merged
+    return boxes
+
+
+def choose_strategy(boxes):
+    """
+    Pick 'per_box' or 'single_pass' by estimated cost from face count and area.
+    Overlapping boxes count their shared area more than once, as repeated blurs would.
+    """
+    if len(boxes) == 0:
+        return 'per_box'
+    widths = boxes[:, 2] - boxes[:, 0]
+    heights = boxes[:, 3] - boxes[:, 1]
+    per_box_cost = int((widths * heights).sum()) + len(boxes) * CALL_OVERHEAD_PX
+    region = (boxes[:, 2].max() - boxes[:, 0].min()) * (boxes[:, 3].max() - boxes[:, 1].min())
+    return 'single_pass' if per_box_cost > SINGLE_PASS_FACTOR * region else 'per_box'
+
+
+def blur_masked(frame, region, boxes, ksize):
+    """Blur region (x1, y1, x2, y2) of the frame once and copy it back only inside boxes"""
+    import cv2
+    import numpy as np
+
+    x0, y0, x1, y1 = region
+    roi = frame[y0:y1, x0:x1]
+    mask = np.zeros(roi.shape[:2], dtype=np.uint8)
+    for bx1, by1, bx2, by2 in (boxes - [x0, y0, x0, y0]).tolist():
+        mask[by1:by2, bx1:bx2] = 1
+    cv2.copyTo(cv2.blur(roi, (ksize, ksize)), mask, roi)
+    return frame
+
+
+def composite_blur(frame, boxes, blur_intensity, strategy='auto'):
+    """
+    Blur all boxes in place so that every pixel is blurred once.
+
+    'per_box' merges overlapping boxes and blurs each group's union once,
+    copying it back through the group's box mask. 'single_pass' does the same
+    for the region spanning all boxes, which keeps crowd scenes with many
+    overlapping faces linear in frame size. Both change exactly the pixels
+    inside the boxes; 'auto' chooses between them with choose_strategy.
+    """
+    if len(boxes) == 0:
+        return frame
+    if strategy == 'auto':
+        strategy = choose_strategy(boxes)
+
+    ksize = max(1, int(blur_intensity))
+    if strategy == 'single_pass':
+        region = (boxes[:, 0].min(), boxes[:, 1].min(), boxes[:, 2].max(), boxes[:, 3].max())
+        return blur_masked(frame, region, boxes, ksize)
+
+    for union in merge_boxes(boxes).tolist():
+        # Merged unions are disjoint, so each box lies inside exactly one of them
+        inside = boxes[(boxes[:, 0] >= union[0]) & (boxes[:, 1] >= union[1]) &
+                       (boxes[:, 2] <= union[2]) & (boxes[:, 3] <= union[3])]
+        if len(inside) == 1:
+            blur_boxes(frame, inside, blur_intensity)
+        else:
+            blur_masked(frame, union, inside, ksize)
+    return frame
+
+
+class FrameProcessor:
+    """
+    Single frame-processing core: detect -> post-process boxes -> anonymize.
+
+    detect(frame) returns an (n, 4) box array, each postprocess step maps
+    (boxes, frame_shape) to boxes, and anonymize(frame, boxes) returns the frame.
+    """
+
+    def __init__(self, detect, anonymize, postprocess=(clip_boxes,)):
+        self.detect = detect
+        self.anonymize = anonymize
+        self.postprocess = list(postprocess)
+
+    def process(self, frame):
+        """Run the chain on one BGR frame, returning (frame, boxes)"""
+        boxes = self.detect(frame)
+        for step in self.postprocess:
+            boxes = step(boxes, frame.shape)
+        return self.anonymize(frame, boxes), boxes
 
 
 class FaceBlurProcessor:
-    """Core face blurring processor using MediaPipe"""
+    """Core face blurring processor with a pluggable face detector (MediaPipe by default)"""
 
-    def __init__(self, model_selection=0, min_detection_confidence=0.5, blur_intensity=30):
+    def __init__(self, model_selection=0, min_detection_confidence=0.5, blur_intensity=30,
+                 detector='mediapipe', composite='auto'):
         self.model_selection = model_selection
         self.min_detection_confidence = min_detection_confidence
         self.blur_intensity = blur_intensity
-        self.mp_face_detection = mp.solutions.face_detection
+        # Compositing strategy from COMPOSITE_STRATEGIES
+        self.composite = composite
+
+        # A backend name from detectors.DETECTORS or a FaceDetector instance
+        if isinstance(detector, FaceDetector):
+            self.detector = detector
+        else:
+            self.detector = create_detector(detector, model_selection=model_selection,
+                                            min_detection_confidence=min_detection_confidence)
+        self.frame_processor = FrameProcessor(self.detect_faces, self.blur_faces)
+
+    def close(self):
+        self.detector.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def detect_faces(self, img):
+        """Detect faces, returning an (n, 4) array of x1, y1, x2, y2 pixel boxes"""
+        return self.detector.detect(img)
+
+    def blur_faces(self, img, boxes):
+        return composite_blur(img, boxes, self.blur_intensity, self.composite)
+
+    def process_image_with_count(self, img):
+        """Blur detected faces in place, returning (image, face_count)"""
+        processed, boxes = self.frame_processor.process(img)
+        return processed, len(boxes)
 
     def process_image(self, img):
         """Process image to blur detected faces"""
-        with self.mp_face_detection.FaceDetection(
-                model_selection=self.model_selection,
-                min_detection_confidence=self.min_detection_confidence
-        ) as face_detection:
-
-            H, W, _ = img.shape
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            faces = face_detection.process(img_rgb)
-
-            if faces.detections is not None:
-                for detection in faces.detections:
-                    location_data = detection.location_data
-                    bbox = location_data.relative_bounding_box
-
-                    x1, y1, w, h = bbox.xmin, bbox.ymin, bbox.width, bbox.height
-                    x1 = int(x1 * W)
-                    y1 = int(y1 * H)
-                    w = int(w * W)
-                    h = int(h * H)
-
-                    # Blur the face region
-                    img[y1:y1 + h, x1:x1 + w, :] = cv2.blur(
-                        img[y1:y1 + h, x1:x1 + w, :],
-                        (self.blur_intensity, self.blur_intensity)
-                    )
-
-            return img
+        return self.frame_processor.process(img)[0]
+
+    def process_encoded_image(self, data, detect_max_side=DETECT_MAX_SIDE):
+        """
+        Decode an encoded image (bytes or an upload buffer, viewed without copying)
+        and blur its faces, returning (image, face_count).
+
+        Large JPEGs are detected on a reduced-resolution decode, with the boxes
+        scaled back; only the final composite is decoded at full resolution.
+        """
+        buf = encoded_buffer(data)
+        factor = reduction_factor(buf, detect_max_side)
+        if factor == 1:
+            return self.process_image_with_count(decode_image(buf))
+
+        small = decode_image(buf, factor)
+        boxes = self.detect_faces(small)
+        small_shape = small.shape
+        del small
+
+        img = decode_image(buf)
+        boxes = scale_boxes(boxes, small_shape, img.shape)
+        for step in self.frame_processor.postprocess:
+            boxes = step(boxes, img.shape)
+        return self.blur_faces(img, boxes), len(boxes)
 
     def process_uploaded_file(self, uploaded_file, file_type='image'):
         """Process uploaded file from Streamlit"""
@@ -54,20 +243,7 @@ class FaceBlurProcessor:
 
     def _process_uploaded_image(self, uploaded_file):
         """Process uploaded image file"""
-        # Convert uploaded file to numpy array
-        file_bytes = np.asarray(bytearray(uploaded_file.read()), dtype=np.uint8)
-        img = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
-
-        if img is None:
-            raise ValueError("Could not decode the uploaded image")
-
-        # Count faces before processing
-        face_count = self.count_faces(img)
-
-        # Process image
-        processed_img = self.process_image(img.copy())
-
-        return processed_img, face_count
+        return self.process_encoded_image(uploaded_file)
 
     def _process_uploaded_video(self, uploaded_file):
         """Process uploaded video file"""
@@ -98,88 +274,110 @@ class FaceBlurProcessor:
             except:
                 pass
 
-    def process_video(self, video_path, output_path=None, progress_callback=None):
-        """Process video to blur faces in all frames"""
+    def process_video(self, video_path, output_path=None, progress_callback=None,
+                      encoder='auto', encoder_options=None):
+        """
+        Process video to blur faces in all frames.
+
+        encoder is 'auto', 'ffmpeg' or 'opencv' (see encoders.create_encoder);
+        with ffmpeg the exact frame rate and the original audio are preserved.
+        """
+        import cv2
+
         cap = cv2.VideoCapture(video_path)
 
-        # Get video properties
-        fps = int(cap.get(cv2.CAP_PROP_FPS))
+        # Get video properties; the frame rate is kept exact, not truncated
+        fps = cap.get(cv2.CAP_PROP_FPS)
         width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
         # Create output path if not provided
         if output_path is None:
-            dirname, filename = os.path.split(video_path)
-            name, ext = os.path.splitext(filename)
-            output_filename = f"{name}_o{ext}"
-            output_path = os.path.join(dirname or ".", output_filename)
+            output_path = output_path_for(video_path)
 
         # Ensure output directory exists
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-        # Video writer
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
 
         frame_count = 0
-        with self.mp_face_detection.FaceDetection(
-                model_selection=self.model_selection,
-                min_detection_confidence=self.min_detection_confidence
-        ) as face_detection:
+        try:
+            with create_encoder(output_path, fps, (width, height), encoder,
+                                audio_source=video_path, **(encoder_options or {})) as out:
+                while True:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+
+                    # Process frame
+                    processed_frame = self.process_image(frame)
+                    out.write(processed_frame)
+
+                    frame_count += 1
+
+                    # Call progress callback if provided
+                    if progress_callback and total_frames > 0:
+                        progress_callback(min(frame_count / total_frames, 1.0))
+        finally:
+            cap.release()
+
+        return output_path
 
-            while True:
+    def preview_video(self, video_path, interval=1.0, max_width=480, max_samples=60, progress_callback=None):
+        """
+        Blur a sampled subset of frames at reduced resolution for a quick preview.
+
+        Takes one frame every `interval` seconds, downscaled to max_width with the
+        blur kernel scaled to match. When that would give more than max_samples
+        frames, the interval is widened so the samples still span the whole video.
+        Returns a list of (timestamp_seconds, processed_bgr_frame, face_count).
+        """
+        import cv2
+
+        cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+        step = max(1, round(interval * fps))
+        if total_frames > 0 and total_frames / step > max_samples:
+            step = -(-total_frames // max_samples)
+        indices = list(range(0, total_frames, step))[:max_samples] if total_frames > 0 else [0]
+
+        # Every frame of a video has the same size, so the scale and the preview chain are set up once
+        width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
+        scale = min(1.0, max_width / width) if width > 0 else 1.0
+        # Same chain as a full render, with the blur kernel scaled to the preview size
+        preview = FrameProcessor(self.frame_processor.detect,
+                                 lambda img, boxes: composite_blur(img, boxes, self.blur_intensity * scale,
+                                                                  self.composite),
+                                 self.frame_processor.postprocess)
+
+        samples = []
+        try:
+            for i, index in enumerate(indices):
+                # Seeking skips decoding of the frames in between
+                cap.set(cv2.CAP_PROP_POS_FRAMES, index)
                 ret, frame = cap.read()
                 if not ret:
                     break
 
-                # Process frame
-                processed_frame = self._process_frame(frame, face_detection)
-                out.write(processed_frame)
+                if scale < 1.0:
+                    frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
 
-                frame_count += 1
+                frame, boxes = preview.process(frame)
+                samples.append((index / fps, frame, len(boxes)))
 
-                # Call progress callback if provided
                 if progress_callback:
-                    progress_callback(frame_count / total_frames)
-
-        cap.release()
-        out.release()
-
-        return output_path
+                    progress_callback((i + 1) / len(indices))
+        finally:
+            cap.release()
 
-    def _process_frame(self, frame, face_detection):
-        """Process a single frame for face blurring"""
-        H, W, _ = frame.shape
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        faces = face_detection.process(frame_rgb)
-
-        if faces.detections is not None:
-            for detection in faces.detections:
-                location_data = detection.location_data
-                bbox = location_data.relative_bounding_box
-
-                x1, y1, w, h = bbox.xmin, bbox.ymin, bbox.width, bbox.height
-                x1 = int(x1 * W)
-                y1 = int(y1 * H)
-                w = int(w * W)
-                h = int(h * H)
-
-                # Blur the face region
-                frame[y1:y1 + h, x1:x1 + w, :] = cv2.blur(
-                    frame[y1:y1 + h, x1:x1 + w, :],
-                    (self.blur_intensity, self.blur_intensity)
-                )
-
-        return frame
+        return samples
 
     def process_image_and_save(self, img, input_path):
         """Process image and save to output path derived from input filename"""
-        # Generate output path by appending "_o" before the extension
-        dirname, filename = os.path.split(input_path)
-        name, ext = os.path.splitext(filename)
-        output_filename = f"{name}_o{ext}"
-        output_path = os.path.join(dirname or ".", output_filename)
+        import cv2
+
+        output_path = output_path_for(input_path)
 
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -194,16 +392,7 @@ class FaceBlurProcessor:
 
     def count_faces(self, img):
         """Count number of faces detected in image"""
-        with self.mp_face_detection.FaceDetection(
-                model_selection=self.model_selection,
-                min_detection_confidence=self.min_detection_confidence
-        ) as face_detection:
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            faces = face_detection.process(img_rgb)
-
-            if faces.detections is not None:
-                return len(faces.detections)
-            return 0
+        return len(clip_boxes(self.detect_faces(img), img.shape))
 
 
 def main():
@@ -219,9 +408,26 @@ def main():
                         help='Blur intensity (default: 30)')
     parser.add_argument("--confidence", type=float, default=0.5,
                         help='Minimum detection confidence (default: 0.5)')
+    parser.add_argument("--detector", default='mediapipe', choices=list(DETECTORS),
+                        help='Face detector backend (default: mediapipe)')
+    parser.add_argument("--composite", default='auto', choices=COMPOSITE_STRATEGIES,
+                        help='Compositing: per-box blurs, one single-pass blur, or chosen per frame (default: auto)')
+    parser.add_argument("--encoder", default='auto', choices=ENCODERS,
+                        help='Video encoder: ffmpeg when available, else OpenCV (default: auto)')
+    parser.add_argument("--codec", default='libx264',
+                        help='ffmpeg video codec (default: libx264)')
+    parser.add_argument("--preset", default='veryfast',
+                        help='ffmpeg encoder preset (default: veryfast)')
+    parser.add_argument("--crf", type=int, default=23,
+                        help='ffmpeg constant rate factor (default: 23)')
+    parser.add_argument("--encoder-threads", type=int, default=0,
+                        help='ffmpeg encoder threads, 0 for automatic (default: 0)')
 
     args = parser.parse_args()
 
+    import cv2
+    import numpy as np
+
     # Check if filepath is provided
     if args.filepath is None:
         print("Error: Please provide a filepath using --filepath argument")
@@ -231,27 +437,34 @@ def main():
     # Initialize processor
     processor = FaceBlurProcessor(
         blur_intensity=args.blur_intensity,
-        min_detection_confidence=args.confidence
+        min_detection_confidence=args.confidence,
+        detector=args.detector,
+        composite=args.composite
     )
 
     if args.mode == 'image':
         # Process image
         print(f"Processing image: {args.filepath}")
-        img = cv2.imread(args.filepath)
-
-        if img is None:
+        try:
+            # Detect on a reduced decode of large JPEGs, blur at full resolution
+            processed_img, face_count = processor.process_encoded_image(np.fromfile(args.filepath, dtype=np.uint8))
+        except (OSError, ValueError):
             print(f"Error: Could not load image from {args.filepath}")
             return
 
-        # Count faces before processing
-        face_count = processor.count_faces(img)
         print(f"Detected {face_count} face(s)")
 
-        # Process image
-        processed_img = processor.process_image(img)
-
         # Save result
-        _, output_path = processor.process_image_and_save(img, args.filepath)
+        output_path = args.output or output_path_for(args.filepath)
+        try:
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+            written = cv2.imwrite(output_path, processed_img)
+        except (OSError, cv2.error):
+            # Unusable directory, or an extension OpenCV has no encoder for
+            written = False
+        if not written:
+            print(f"Error: Could not write image to {output_path}")
+            return
         print(f"Blurred image saved to: {output_path}")
 
     elif args.mode == 'video':
@@ -263,8 +476,11 @@ def main():
 
         result_path = processor.process_video(
             args.filepath,
-            None,  # Let method auto-generate based on input
-            progress_callback
+            args.output,  # None lets the method derive it from the input
+            progress_callback,
+            encoder=args.encoder,
+            encoder_options={'codec': args.codec, 'preset': args.preset,
+                             'crf': args.crf, 'threads': args.encoder_threads}
         )
         print(f"Blurred video saved to: {result_path}")
 
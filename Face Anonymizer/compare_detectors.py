@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from detectors import DETECTORS, create_detector
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def parse_backend(spec):
+    """Parses 'name:key=value,...' into (name, kwargs), e.g. haar:downscale=0.5,min_neighbors=4"""
+    name, _, params = spec.partition(':')
+    kwargs = {}
+    for item in filter(None, params.split(',')):
+        key, _, value = item.partition('=')
+        try:
+            kwargs[key] = json.loads(value)
+        except ValueError:
+            kwargs[key] = value
+    return name, kwargs
+
+
+def load_frames(path, max_frames, scale):
+    """Loads up to max_frames from an image directory or a video so every backend sees the same inputs"""
+    frames = []
+    if os.path.isdir(path):
+        names = sorted(f for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS))
+        for name in names[:max_frames]:
+            img = cv2.imread(os.path.join(path, name))
+            if img is not None:
+                frames.append((name, img))
+    else:
+        cap = cv2.VideoCapture(path)
+        while len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append((str(len(frames)), frame))
+        cap.release()
+
+    if scale != 1.0:
+        frames = [(key, cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA))
+                  for key, img in frames]
+    return frames
+
+
+def box_iou(a, b):
+    """IoU matrix between (n, 4) and (m, 4) arrays of x1, y1, x2, y2 boxes"""
+    a = a[:, None, :].astype(np.float64)
+    b = b[None, :, :].astype(np.float64)
+    w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = w * h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-9)
+
+
+def count_matches(predicted, truth, threshold):
+    """Greedy one-to-one matching by IoU"""
+    if len(predicted) == 0 or len(truth) == 0:
+        return 0
+    iou = box_iou(predicted, truth)
+    matches = 0
+    while iou.size and iou.max() >= threshold:
+        i, j = np.unravel_index(np.argmax(iou), iou.shape)
+        iou[i, :] = -1
+        iou[:, j] = -1
+        matches += 1
+    return matches
+
+
+def run_backend(spec, frames):
+    """Returns per-frame boxes and detection throughput for one backend"""
+    name, kwargs = parse_backend(spec)
+    detector = create_detector(name, **kwargs)
+    try:
+        detector.detect(frames[0][1])  # warm-up: model loading is not throughput
+        boxes = {}
+        start = time.perf_counter()
+        for key, img in frames:
+            boxes[key] = detector.detect(img)
+        elapsed = time.perf_counter() - start
+    finally:
+        detector.close()
+    return boxes, len(frames) / elapsed if elapsed else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare face detector backends on recall and throughput')
+    parser.add_argument("--input", required=True,
+                        help='Image directory or video file')
+    parser.add_argument("--backends", nargs='+', default=['mediapipe', 'haar', 'haar:downscale=0.5'],
+                        help=f"Backends as name:key=value,... (available: {', '.join(DETECTORS)})")
+    parser.add_argument("--reference", default='mediapipe:model_selection=1',
+                        help='Backend whose detections are ground truth when --annotations is not given')
+    parser.add_argument("--annotations", default=None,
+                        help='JSON mapping image name (or frame index) to [[x1, y1, x2, y2], ...]')
+    parser.add_argument("--frames", type=int, default=200,
+                        help='Maximum frames to load (default: 200)')
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help='Resize inputs first, e.g. 0.5 to emulate low-resolution feeds (default: 1.0)')
+    parser.add_argument("--iou", type=float, default=0.3,
+                        help='IoU for a detection to count as a match (default: 0.3)')
+    parser.add_argument("--json", action='store_true',
+                        help='Print results as JSON instead of a table')
+
+    args = parser.parse_args()
+
+    frames = load_frames(args.input, args.frames, args.scale)
+    if not frames:
+        print(f"Error: No frames could be loaded from {args.input}")
+        return
+
+    if args.annotations:
+        with open(args.annotations) as f:
+            annotations = json.load(f)
+        truth = {key: np.asarray(annotations.get(key, []), dtype=np.float64).reshape(-1, 4) * args.scale
+                 for key, _ in frames}
+    else:
+        truth, _ = run_backend(args.reference, frames)
+
+    results = []
+    for spec in args.backends:
+        boxes, fps = run_backend(spec, frames)
+        n_truth = sum(len(truth[key]) for key, _ in frames)
+        n_pred = sum(len(boxes[key]) for key, _ in frames)
+        matched = sum(count_matches(boxes[key], truth[key], args.iou) for key, _ in frames)
+        results.append({
+            'backend': spec,
+            'fps': fps,
+            'recall': matched / n_truth if n_truth else None,
+            'precision': matched / n_pred if n_pred else None,
+            'faces': n_pred,
+        })
+
+    if args.json:
+        print(json.dumps({'frames': len(frames), 'truth': args.annotations or args.reference,
+                          'results': results}, indent=2))
+        return
+
+    print(f"Frames: {len(frames)}  Ground truth: {args.annotations or args.reference}")
+    print(f"{'backend':<32} {'FPS':>9} {'recall':>8} {'precision':>10} {'faces':>7}")
+    for r in results:
+        recall = '-' if r['recall'] is None else f"{r['recall']:.3f}"
+        precision = '-' if r['precision'] is None else f"{r['precision']:.3f}"
+        print(f"{r['backend']:<32} {r['fps']:>9.1f} {recall:>8} {precision:>10} {r['faces']:>7}")
+
+
+if __name__ == "__main__":
+    main()
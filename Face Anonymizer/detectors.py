@@ -0,0 +1,146 @@
+import os
+
+# cv2, mediapipe and numpy are imported where they are used, so picking a backend stays cheap
+
+
+class FaceDetector:
+    """
+    Interface for face detector backends.
+
+    detect(frame) takes a BGR frame and returns an (n, 4) int32 array of
+    x1, y1, x2, y2 pixel boxes. close() releases any resources.
+    """
+
+    name = None
+
+    def detect(self, frame):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def detections_to_boxes(detections, frame_shape):
+    """Convert MediaPipe relative bounding boxes to an (n, 4) int array of x1, y1, x2, y2"""
+    import numpy as np
+
+    H, W = frame_shape[:2]
+    boxes = np.empty((len(detections or []), 4), dtype=np.int32)
+    for i, detection in enumerate(detections or []):
+        bbox = detection.location_data.relative_bounding_box
+        x1 = int(bbox.xmin * W)
+        y1 = int(bbox.ymin * H)
+        boxes[i] = (x1, y1, x1 + int(bbox.width * W), y1 + int(bbox.height * H))
+    return boxes
+
+
+class MediaPipeDetector(FaceDetector):
+    """MediaPipe face detection (model_selection 0: within 2 meters, 1: within 5 meters)"""
+
+    name = 'mediapipe'
+
+    def __init__(self, model_selection=0, min_detection_confidence=0.5):
+        self.model_selection = model_selection
+        self.min_detection_confidence = min_detection_confidence
+        self._face_detection = None
+
+    @property
+    def face_detection(self):
+        """MediaPipe graph, built on first use and reused for every frame"""
+        if self._face_detection is None:
+            import mediapipe as mp
+
+            self._face_detection = mp.solutions.face_detection.FaceDetection(
+                model_selection=self.model_selection,
+                min_detection_confidence=self.min_detection_confidence
+            )
+        return self._face_detection
+
+    def detect(self, frame):
+        import cv2
+
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        faces = self.face_detection.process(frame_rgb)
+        return detections_to_boxes(faces.detections, frame.shape)
+
+    def close(self):
+        if self._face_detection is not None:
+            self._face_detection.close()
+            self._face_detection = None
+
+
+class HaarCascadeDetector(FaceDetector):
+    """
+    OpenCV Haar cascade detector, using only files shipped with opencv-python.
+
+    Much cheaper than MediaPipe on small frames. downscale < 1 runs detection on a
+    resized grayscale frame and maps boxes back. min_detection_confidence is
+    accepted for interface compatibility and mapped onto min_neighbors.
+    """
+
+    name = 'haar'
+
+    def __init__(self, cascade='haarcascade_frontalface_default.xml', scale_factor=1.1,
+                 min_neighbors=None, min_size=24, downscale=1.0, min_detection_confidence=0.5,
+                 model_selection=None):
+        self.cascade_name = cascade
+        self.scale_factor = scale_factor
+        # Higher confidence requires more overlapping candidate windows
+        self.min_neighbors = min_neighbors if min_neighbors is not None else max(1, round(min_detection_confidence * 10))
+        self.min_size = min_size
+        self.downscale = downscale
+        self._cascade = None
+
+    @property
+    def cascade(self):
+        if self._cascade is None:
+            import cv2
+
+            # Either a path to a cascade file or the name of one bundled with OpenCV
+            path = self.cascade_name
+            if not os.path.isfile(path):
+                path = os.path.join(cv2.data.haarcascades, self.cascade_name)
+            self._cascade = cv2.CascadeClassifier(path)
+            if self._cascade.empty():
+                raise ValueError(f"Could not load Haar cascade: {path}")
+        return self._cascade
+
+    def detect(self, frame):
+        import cv2
+        import numpy as np
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        if self.downscale != 1.0:
+            gray = cv2.resize(gray, None, fx=self.downscale, fy=self.downscale, interpolation=cv2.INTER_AREA)
+
+        min_size = max(1, int(self.min_size * self.downscale))
+        found = self.cascade.detectMultiScale(gray, scaleFactor=self.scale_factor,
+                                              minNeighbors=self.min_neighbors, minSize=(min_size, min_size))
+        if len(found) == 0:
+            return np.empty((0, 4), dtype=np.int32)
+
+        found = np.asarray(found, dtype=np.float64) / self.downscale
+        boxes = np.empty((len(found), 4), dtype=np.int32)
+        boxes[:, 0] = found[:, 0]
+        boxes[:, 1] = found[:, 1]
+        boxes[:, 2] = found[:, 0] + found[:, 2]
+        boxes[:, 3] = found[:, 1] + found[:, 3]
+        return boxes
+
+
+# Backend registry: name -> factory accepting keyword arguments
+DETECTORS = {
+    MediaPipeDetector.name: MediaPipeDetector,
+    HaarCascadeDetector.name: HaarCascadeDetector,
+}
+
+
+def register_detector(name, factory):
+    """Register a third-party backend; factory(**kwargs) must return a FaceDetector"""
+    DETECTORS[name] = factory
+
+
+def create_detector(name, **kwargs):
+    if name not in DETECTORS:
+        raise ValueError(f"Unknown detector backend: {name} (available: {', '.join(DETECTORS)})")
+    return DETECTORS[name](**kwargs)
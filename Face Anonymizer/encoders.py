@@ -0,0 +1,123 @@
+import shutil
+import subprocess
+from fractions import Fraction
+
+ENCODERS = ['auto', 'ffmpeg', 'opencv']
+
+
+def exact_fps(fps):
+    """Frame rate as a fraction, so 29.97 stays 30000/1001 instead of being truncated to 29"""
+    if not fps or fps <= 0:
+        return Fraction(25)
+    return Fraction(fps).limit_denominator(1001)
+
+
+class OpenCVEncoder:
+    """cv2.VideoWriter output; always available but drops audio"""
+
+    def __init__(self, output_path, fps, size, fourcc='mp4v'):
+        import cv2
+
+        self.output_path = output_path
+        self.writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*fourcc), float(exact_fps(fps)), size)
+        if not self.writer.isOpened():
+            raise RuntimeError(f"Could not open video writer for {output_path}")
+
+    def write(self, frame):
+        self.writer.write(frame)
+
+    def close(self):
+        self.writer.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FfmpegEncoder:
+    """
+    Streams raw BGR frames into a local ffmpeg process.
+
+    Codec, preset, CRF and thread count are configurable, the frame rate is
+    passed as an exact fraction, and when audio_source is given its audio
+    track (if any) is muxed into the output unchanged. Odd frame sizes are
+    padded by one pixel, since yuv420p needs even width and height.
+    """
+
+    def __init__(self, output_path, fps, size, codec='libx264', preset='veryfast', crf=23, threads=0,
+                 audio_source=None, pix_fmt='yuv420p', ffmpeg='ffmpeg'):
+        self.output_path = output_path
+        width, height = size
+        rate = exact_fps(fps)
+
+        cmd = [ffmpeg, '-y', '-loglevel', 'error',
+               '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}',
+               '-r', f'{rate.numerator}/{rate.denominator}', '-i', '-']
+        if audio_source is not None:
+            # The trailing '?' keeps inputs without an audio track working
+            cmd += ['-i', audio_source, '-map', '0:v:0', '-map', '1:a:0?', '-c:a', 'copy', '-shortest']
+        if width % 2 or height % 2:
+            cmd += ['-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2']
+        cmd += ['-c:v', codec, '-preset', preset, '-crf', str(crf), '-threads', str(threads),
+                '-pix_fmt', pix_fmt, output_path]
+
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._closed = False
+
+    def write(self, frame):
+        import numpy as np
+
+        try:
+            self.proc.stdin.write(memoryview(np.ascontiguousarray(frame)).cast('B'))
+        except BrokenPipeError:
+            # ffmpeg exited early (bad codec/preset, unwritable path): raise its own error
+            self.close()
+            raise
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self.proc.stdin and not self.proc.stdin.closed:
+            try:
+                self.proc.stdin.close()
+            except BrokenPipeError:
+                pass  # ffmpeg already exited; its error is reported below
+        stderr = self.proc.stderr.read().decode(errors='replace')
+        if self.proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed for {self.output_path}: {stderr.strip()}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.close()
+        except RuntimeError:
+            # Don't hide the exception that interrupted writing
+            if exc_type is None:
+                raise
+
+
+def create_encoder(output_path, fps, size, encoder='auto', audio_source=None, **options):
+    """
+    Opens a video encoder. 'auto' uses ffmpeg when it is on PATH and can be
+    started, and falls back to cv2.VideoWriter otherwise; options are passed to
+    FfmpegEncoder (codec, preset, crf, threads).
+
+    ffmpeg only rejects settings such as an unknown codec or preset once frames
+    arrive, so those surface as a RuntimeError with ffmpeg's message from write()
+    rather than as a silent fallback to mp4v.
+    """
+    if encoder not in ENCODERS:
+        raise ValueError(f"Unknown encoder: {encoder} (available: {', '.join(ENCODERS)})")
+    if encoder == 'ffmpeg':
+        return FfmpegEncoder(output_path, fps, size, audio_source=audio_source, **options)
+    if encoder == 'auto' and shutil.which('ffmpeg'):
+        try:
+            return FfmpegEncoder(output_path, fps, size, audio_source=audio_source, **options)
+        except OSError:
+            pass  # On PATH but not runnable
+    return OpenCVEncoder(output_path, fps, size)
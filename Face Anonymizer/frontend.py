@@ -1,10 +1,9 @@
 import streamlit as st
-import cv2
-import numpy as np
-from PIL import Image
 import tempfile
 import os
 from blur_backend import FaceBlurProcessor
+from ingest import decode_preview, fit_within, PREVIEW_MAX_SIDE
+from detectors import DETECTORS
 
 # Configure page
 st.set_page_config(
@@ -140,6 +139,14 @@ def main():
             help="0: Within 2 meters, 1: Within 5 meters"
         )
 
+        # Detector backend
+        detector_backend = st.selectbox(
+            "Detector Backend",
+            list(DETECTORS),
+            index=0,
+            help="mediapipe: most accurate, haar: OpenCV Haar cascade, much faster on low-resolution input"
+        )
+
         st.markdown("---")
         st.markdown("### 📊 Processing Stats")
 
@@ -204,6 +211,9 @@ def main():
         )
 
     if uploaded_file is not None:
+        # Deferred so the page renders before OpenCV is loaded on a cold start
+        import cv2
+
         # Display file info
         file_size_mb = uploaded_file.size / (1024 * 1024)
         st.markdown(f"""
@@ -217,7 +227,8 @@ def main():
         processor = FaceBlurProcessor(
             model_selection=model_selection,
             min_detection_confidence=detection_confidence,
-            blur_intensity=blur_intensity
+            blur_intensity=blur_intensity,
+            detector=detector_backend
         )
 
         # Processing section
@@ -229,23 +240,16 @@ def main():
 
             with col1:
                 st.markdown("### Original Image")
-                image = Image.open(uploaded_file)
-                st.image(image, use_container_width=True)
+                # Reduced-resolution JPEG decode straight from the upload buffer
+                st.image(decode_preview(uploaded_file), channels="BGR", use_container_width=True)
 
             # Process button
             if st.button("🎯 Blur Faces", key="process_image"):
                 with st.spinner("Processing image..."):
-                    # Convert PIL to OpenCV
-                    img_array = np.array(image)
-                    img_cv = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-
-                    # Count faces first
-                    face_count = processor.count_faces(img_cv)
+                    # Decode once from the upload buffer, detect on a reduced decode, blur at full size
+                    processed_img, face_count = processor.process_encoded_image(uploaded_file)
                     st.session_state.face_count = face_count
 
-                    # Process image
-                    processed_img = processor.process_image(img_cv)
-
                     # Save to output directory (like original code)
                     output_dir = "./output"
                     os.makedirs(output_dir, exist_ok=True)
@@ -253,12 +257,8 @@ def main():
                     output_path = os.path.join(output_dir, f"{name}_o{ext}")
                     cv2.imwrite(output_path, processed_img)
 
-                    # Convert back to RGB for display
-                    processed_img_rgb = cv2.cvtColor(processed_img, cv2.COLOR_BGR2RGB)
-                    processed_pil = Image.fromarray(processed_img_rgb)
-
-                    # Store in session state
-                    st.session_state.processed_image = processed_pil
+                    # Store in session state; the displayed copy is downscaled, BGR is shown as is
+                    st.session_state.processed_image = fit_within(processed_img, PREVIEW_MAX_SIDE)
                     st.session_state.processed_cv_image = processed_img
                     st.session_state.saved_image_path = output_path
 
@@ -277,7 +277,7 @@ def main():
             if 'processed_image' in st.session_state and st.session_state.processed_image is not None:
                 with col2:
                     st.markdown("### Processed Image")
-                    st.image(st.session_state.processed_image, use_container_width=True)
+                    st.image(st.session_state.processed_image, channels="BGR", use_container_width=True)
 
                     # Display saved file path
                     if 'saved_image_path' in st.session_state:
@@ -304,7 +304,7 @@ def main():
 
             # Display video info
             cap = cv2.VideoCapture(temp_video_path)
-            fps = int(cap.get(cv2.CAP_PROP_FPS))
+            fps = cap.get(cv2.CAP_PROP_FPS)
             frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
             duration = frame_count / fps if fps > 0 else 0
             width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
@@ -315,13 +315,54 @@ def main():
             <div class="info-box">
                 🎬 <strong>Duration:</strong> {duration:.1f}s<br>
                 📺 <strong>Resolution:</strong> {width}x{height}<br>
-                🎞️ <strong>FPS:</strong> {fps}<br>
+                🎞️ <strong>FPS:</strong> {fps:.2f}<br>
                 📋 <strong>Total Frames:</strong> {frame_count}
             </div>
             """, unsafe_allow_html=True)
 
-            # Process button
-            if st.button("🎯 Blur Faces in Video", key="process_video"):
+            # Quick preview: sampled, downscaled frames so settings can be checked in seconds
+            st.markdown("#### 👀 Quick Preview")
+            preview_interval = st.slider(
+                "Preview sample interval (seconds)",
+                min_value=0.5,
+                max_value=5.0,
+                value=1.0,
+                step=0.5,
+                help="One frame is blurred at reduced resolution every interval"
+            )
+            preview_key = (uploaded_file.name, uploaded_file.size, blur_intensity,
+                           detection_confidence, model_selection, detector_backend, preview_interval)
+
+            if st.button("👀 Preview Blur Settings", key="preview_video"):
+                progress_bar = st.progress(0)
+                with st.spinner("Rendering preview..."):
+                    samples = processor.preview_video(
+                        temp_video_path,
+                        interval=preview_interval,
+                        progress_callback=progress_bar.progress
+                    )
+                progress_bar.empty()
+                st.session_state.video_preview = {'key': preview_key, 'samples': samples}
+
+            preview = st.session_state.get('video_preview')
+            if preview and preview['samples']:
+                if preview['key'] != preview_key:
+                    st.info("Settings changed since this preview. Preview again to check them.")
+
+                samples = preview['samples']
+                index = 0
+                if len(samples) > 1:
+                    index = st.slider("Scrub preview", 0, len(samples) - 1, 0, key="preview_scrub")
+                timestamp, frame, faces = samples[index]
+                st.image(frame, channels="BGR", caption=f"{timestamp:.1f}s · {faces} face(s)",
+                         use_container_width=True)
+
+                # Thumbnail strip of all sampled frames
+                st.image([f for _, f, _ in samples], channels="BGR", width=120,
+                         caption=[f"{t:.0f}s" for t, _, _ in samples])
+
+            # Process button: the full render starts only once the settings are confirmed
+            if st.button("✅ Confirm & Blur Full Video", key="process_video"):
                 progress_bar = st.progress(0)
                 status_text = st.empty()
 
@@ -0,0 +1,104 @@
+# cv2 and numpy are imported inside the functions, so importing ingest stays cheap
+
+# Long side that detection and on-screen previews need; larger JPEGs are decoded
+# at 1/2, 1/4 or 1/8 scale, which libjpeg does while decoding (DCT scaling)
+# instead of producing the full image and resizing it
+DETECT_MAX_SIDE = 1280
+PREVIEW_MAX_SIDE = 1200
+
+
+def encoded_buffer(data):
+    """
+    uint8 view of an encoded image without copying it.
+
+    Accepts bytes, a memoryview, an array, or a file-like object. BytesIO-like
+    uploads (Streamlit's UploadedFile) are viewed through getbuffer().
+    """
+    import numpy as np
+
+    if hasattr(data, 'getbuffer'):
+        data = data.getbuffer()
+    elif hasattr(data, 'read'):
+        data = data.read()
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+def jpeg_size(buf):
+    """(width, height) from the frame header of a JPEG buffer, or None for anything else"""
+    if len(buf) < 4 or buf[0] != 0xFF or buf[1] != 0xD8:
+        return None
+    i = 2
+    while i + 9 < len(buf):
+        if buf[i] != 0xFF:
+            return None
+        marker = buf[i + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # Markers without a length field
+            i += 2
+            continue
+        # SOF0-SOF15, except DHT (C4), JPG (C8) and DAC (CC), carry the image size
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height = int(buf[i + 5]) << 8 | int(buf[i + 6])
+            width = int(buf[i + 7]) << 8 | int(buf[i + 8])
+            return width, height
+        i += 2 + (int(buf[i + 2]) << 8 | int(buf[i + 3]))
+    return None
+
+
+def reduction_factor(buf, max_side):
+    """Largest JPEG decode scale (1, 2, 4 or 8) that still leaves the long side at least max_side"""
+    size = jpeg_size(buf)
+    if size is None:
+        return 1
+    for factor in (8, 4, 2):
+        if max(size) // factor >= max_side:
+            return factor
+    return 1
+
+
+def decode_image(buf, factor=1):
+    """Decode an encoded buffer to BGR at 1/factor scale"""
+    import cv2
+
+    flags = {
+        1: cv2.IMREAD_COLOR,
+        2: cv2.IMREAD_REDUCED_COLOR_2,
+        4: cv2.IMREAD_REDUCED_COLOR_4,
+        8: cv2.IMREAD_REDUCED_COLOR_8,
+    }[factor]
+    img = cv2.imdecode(buf, flags)
+    if img is None:
+        raise ValueError("Could not decode the image")
+    return img
+
+
+def fit_within(img, max_side):
+    """Downscale so the long side is at most max_side"""
+    import cv2
+
+    scale = max_side / max(img.shape[:2])
+    if scale >= 1.0:
+        return img
+    return cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def decode_preview(data, max_side=PREVIEW_MAX_SIDE):
+    """BGR preview of an encoded image, decoded at the smallest JPEG scale that covers max_side"""
+    buf = encoded_buffer(data)
+    return fit_within(decode_image(buf, reduction_factor(buf, max_side)), max_side)
+
+
+def scale_boxes(boxes, from_shape, to_shape):
+    """Map x1, y1, x2, y2 boxes found on a reduced decode onto the full-size image, rounding outwards"""
+    import numpy as np
+
+    sy = to_shape[0] / from_shape[0]
+    sx = to_shape[1] / from_shape[1]
+    scaled = boxes.astype(np.float64) * [sx, sy, sx, sy]
+    scaled[:, :2] = np.floor(scaled[:, :2])
+    scaled[:, 2:] = np.ceil(scaled[:, 2:])
+    return scaled.astype(np.int32)
@@ -0,0 +1,318 @@
+import argparse
+import collections
+import multiprocessing
+import os
+import threading
+import time
+
+import cv2
+
+from blur_backend import FaceBlurProcessor, output_path_for
+from detectors import DETECTORS
+from encoders import create_encoder
+
+DROP_POLICIES = ['drop_oldest', 'drop_newest', 'block']
+
+# Set in each pool worker by _init_worker
+_processor = None
+
+
+def _init_worker(processor_kwargs):
+    global _processor
+    # Parallelism comes from the pool, so keep OpenCV from oversubscribing cores
+    cv2.setNumThreads(1)
+    _processor = FaceBlurProcessor(**processor_kwargs)
+
+
+def _process_batch(batch):
+    """Runs in a worker: blurs a batch of (stream_id, seq, captured_at, frame)"""
+    results = []
+    for stream_id, seq, captured_at, frame in batch:
+        processed, face_count = _processor.process_image_with_count(frame)
+        results.append((stream_id, seq, captured_at, processed, face_count))
+    return results
+
+
+class StreamReader(threading.Thread):
+    """
+    Reads one stream into a bounded queue.
+
+    When the queue is full, 'drop_oldest' discards the oldest queued frame,
+    'drop_newest' discards the incoming frame, and 'block' waits (no drops,
+    useful for files). realtime paces file reads at the source frame rate so
+    local videos behave like live cameras.
+    """
+
+    def __init__(self, stream_id, source, queue_size=4, policy='drop_oldest', realtime=False):
+        super().__init__(daemon=True)
+        self.stream_id = stream_id
+        self.source = source
+        self.queue_size = queue_size
+        self.policy = policy
+        self.realtime = realtime
+
+        self.queue = collections.deque()
+        self.condition = threading.Condition()
+        self.fps = 0.0
+        self.size = None
+        self.read = 0
+        self.dropped = 0
+        self.finished = False
+        self.stopped = False
+
+    def run(self):
+        cap = cv2.VideoCapture(self.source)
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 25
+        interval = 1.0 / self.fps
+        next_time = time.monotonic()
+
+        try:
+            while not self.stopped:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if self.size is None:
+                    self.size = (frame.shape[1], frame.shape[0])
+                captured_at = time.monotonic()
+
+                with self.condition:
+                    if len(self.queue) >= self.queue_size:
+                        if self.policy == 'drop_oldest':
+                            self.queue.popleft()
+                            self.dropped += 1
+                        elif self.policy == 'drop_newest':
+                            self.dropped += 1
+                            self.read += 1
+                            frame = None
+                        else:
+                            while len(self.queue) >= self.queue_size and not self.stopped:
+                                self.condition.wait()
+                    if frame is not None:
+                        self.queue.append((self.read, captured_at, frame))
+                        self.read += 1
+
+                if self.realtime:
+                    next_time += interval
+                    time.sleep(max(0.0, next_time - time.monotonic()))
+        finally:
+            cap.release()
+            self.finished = True
+
+    def take(self):
+        """Pops the oldest queued frame, or None when the queue is empty"""
+        with self.condition:
+            if not self.queue:
+                return None
+            item = self.queue.popleft()
+            self.condition.notify()
+            return item
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+
+class StreamScheduler:
+    """
+    Anonymizes N streams with a fixed pool of FaceBlurProcessor workers.
+
+    Frames are batched fairly: each batch takes one frame from each stream in
+    turn, starting from a rotating position, so no stream starves. Results are
+    handled in submission order, which keeps every stream's frames in order.
+    sink(stream_id, seq, frame, face_count) receives each processed frame.
+    """
+
+    def __init__(self, sources, workers=None, batch_size=8, queue_size=4, policy='drop_oldest',
+                 realtime=False, processor_kwargs=None, sink=None):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {policy} (available: {', '.join(DROP_POLICIES)})")
+        self.readers = [StreamReader(i, source, queue_size, policy, realtime) for i, source in enumerate(sources)]
+        self.sources = list(sources)
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.processor_kwargs = processor_kwargs or {}
+        self.sink = sink
+
+        self.processed = [0] * len(self.readers)
+        self.lag_total = [0.0] * len(self.readers)
+        self.lag_max = [0.0] * len(self.readers)
+        self._next_stream = 0
+        self._start = None
+
+    def _next_batch(self):
+        batch = []
+        n = len(self.readers)
+        while len(batch) < self.batch_size:
+            took = False
+            for offset in range(n):
+                reader = self.readers[(self._next_stream + offset) % n]
+                item = reader.take()
+                if item is not None:
+                    seq, captured_at, frame = item
+                    batch.append((reader.stream_id, seq, captured_at, frame))
+                    took = True
+                    if len(batch) == self.batch_size:
+                        break
+            self._next_stream = (self._next_stream + 1) % n
+            if not took:
+                break
+        return batch
+
+    def _handle(self, results):
+        now = time.monotonic()
+        for stream_id, seq, captured_at, frame, face_count in results:
+            lag = now - captured_at
+            self.processed[stream_id] += 1
+            self.lag_total[stream_id] += lag
+            self.lag_max[stream_id] = max(self.lag_max[stream_id], lag)
+            if self.sink is not None:
+                self.sink(stream_id, seq, frame, face_count)
+
+    def stats(self):
+        """Per-stream frames read, processed and dropped, throughput and lag"""
+        elapsed = time.monotonic() - self._start if self._start else 0.0
+        report = []
+        for i, reader in enumerate(self.readers):
+            report.append({
+                'stream': self.sources[i],
+                'read': reader.read,
+                'processed': self.processed[i],
+                'dropped': reader.dropped,
+                'fps': self.processed[i] / elapsed if elapsed else 0.0,
+                'mean_lag_s': self.lag_total[i] / self.processed[i] if self.processed[i] else 0.0,
+                'max_lag_s': self.lag_max[i],
+            })
+        return report
+
+    def run(self, report_callback=None, report_interval=5.0):
+        max_in_flight = 2 * self.workers
+
+        # Spawned rather than forked, and created before any reader thread starts: forking
+        # while reader threads hold OpenCV/FFmpeg or queue locks can deadlock workers, and
+        # the pool re-forks a replacement whenever a worker dies
+        pool = multiprocessing.get_context('spawn').Pool(self.workers, initializer=_init_worker,
+                                                         initargs=(self.processor_kwargs,))
+        self._start = time.monotonic()
+        next_report = self._start + report_interval
+        for reader in self.readers:
+            reader.start()
+
+        in_flight = collections.deque()
+        try:
+            while True:
+                while len(in_flight) < max_in_flight:
+                    batch = self._next_batch()
+                    if not batch:
+                        break
+                    in_flight.append(pool.apply_async(_process_batch, (batch,)))
+
+                if in_flight and in_flight[0].ready():
+                    self._handle(in_flight.popleft().get())
+                elif not in_flight and all(r.finished and not r.queue for r in self.readers):
+                    break
+                else:
+                    time.sleep(0.001)
+
+                if report_callback and time.monotonic() >= next_report:
+                    report_callback(self.stats())
+                    next_report += report_interval
+        finally:
+            for reader in self.readers:
+                reader.stop()
+            pool.terminate()
+            pool.join()
+
+        return self.stats()
+
+
+class EncoderSink:
+    """Writes each stream's processed frames to its own output video"""
+
+    def __init__(self, scheduler, output_dir, encoder='auto'):
+        self.scheduler = scheduler
+        self.output_dir = output_dir
+        self.encoder = encoder
+        self.encoders = {}
+
+    def __call__(self, stream_id, seq, frame, face_count):
+        if stream_id not in self.encoders:
+            reader = self.scheduler.readers[stream_id]
+            source = str(reader.source)
+            name = os.path.basename(output_path_for(source)) if not source.isdigit() else f"camera{source}_o.mp4"
+            if self.scheduler.sources.count(reader.source) > 1:
+                # The same file passed twice would otherwise share one output
+                root, ext = os.path.splitext(name)
+                name = f"{root}_{stream_id}{ext}"
+            os.makedirs(self.output_dir, exist_ok=True)
+            self.encoders[stream_id] = create_encoder(os.path.join(self.output_dir, name), reader.fps,
+                                                      (frame.shape[1], frame.shape[0]), self.encoder)
+        self.encoders[stream_id].write(frame)
+
+    def close(self):
+        for encoder in self.encoders.values():
+            encoder.close()
+
+
+def print_stats(stats):
+    print(f"{'stream':<30} {'read':>7} {'done':>7} {'dropped':>8} {'fps':>7} {'lag ms':>8} {'max ms':>8}")
+    for s in stats:
+        print(f"{str(s['stream'])[-30:]:<30} {s['read']:>7} {s['processed']:>7} {s['dropped']:>8} "
+              f"{s['fps']:>7.1f} {s['mean_lag_s'] * 1000:>8.1f} {s['max_lag_s'] * 1000:>8.1f}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Anonymize several streams with a shared detector pool')
+    parser.add_argument("--streams", nargs='+', required=True,
+                        help='Camera indices or video files (files stand in for cameras with --realtime)')
+    parser.add_argument("--workers", type=int, default=None,
+                        help='Detector worker processes (default: CPU count)')
+    parser.add_argument("--batch-size", type=int, default=8,
+                        help='Frames per batch sent to a worker (default: 8)')
+    parser.add_argument("--queue-size", type=int, default=4,
+                        help='Frames buffered per stream before dropping (default: 4)')
+    parser.add_argument("--policy", default='drop_oldest', choices=DROP_POLICIES,
+                        help='What to do when a stream queue is full (default: drop_oldest)')
+    parser.add_argument("--realtime", action='store_true',
+                        help='Read video files at their frame rate, like live cameras')
+    parser.add_argument("--output-dir", default=None,
+                        help='Write each anonymized stream to this directory (optional)')
+    parser.add_argument("--detector", default='mediapipe', choices=list(DETECTORS),
+                        help='Face detector backend (default: mediapipe)')
+    parser.add_argument("--blur-intensity", type=int, default=30,
+                        help='Blur intensity (default: 30)')
+    parser.add_argument("--confidence", type=float, default=0.5,
+                        help='Minimum detection confidence (default: 0.5)')
+    parser.add_argument("--report-interval", type=float, default=5.0,
+                        help='Seconds between lag reports (default: 5)')
+
+    args = parser.parse_args()
+
+    sources = [int(s) if s.isdigit() else s for s in args.streams]
+    scheduler = StreamScheduler(
+        sources,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        queue_size=args.queue_size,
+        policy=args.policy,
+        realtime=args.realtime,
+        processor_kwargs={'detector': args.detector, 'blur_intensity': args.blur_intensity,
+                          'min_detection_confidence': args.confidence},
+    )
+    sink = None
+    if args.output_dir:
+        sink = scheduler.sink = EncoderSink(scheduler, args.output_dir)
+
+    try:
+        stats = scheduler.run(report_callback=print_stats, report_interval=args.report_interval)
+    finally:
+        if sink is not None:
+            sink.close()
+
+    print("Final:")
+    print_stats(stats)
+
+
+if __name__ == "__main__":
+    main()
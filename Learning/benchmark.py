@@ -0,0 +1,162 @@
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+import operations as ops
+
+RESOLUTIONS = {
+    '480p': (640, 480),
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+    '4k': (3840, 2160),
+}
+
+DTYPES = {
+    'uint8': np.uint8,
+    'uint16': np.uint16,
+    'float32': np.float32,
+}
+
+# group -> variant -> (function(image, ksize), uses kernel size, input kind)
+CASES = {
+    'colorspace': {
+        'gray': (lambda img, k: ops.convert(img, 'gray'), False, 'bgr'),
+        'rgb': (lambda img, k: ops.convert(img, 'rgb'), False, 'bgr'),
+        'hsv': (lambda img, k: ops.convert(img, 'hsv'), False, 'bgr'),
+    },
+    'blur': {
+        'box': (lambda img, k: ops.blur(img, 'box', k), True, 'bgr'),
+        'gaussian': (lambda img, k: ops.blur(img, 'gaussian', k), True, 'bgr'),
+        'median': (lambda img, k: ops.blur(img, 'median', k), True, 'bgr'),
+        'stack': (lambda img, k: ops.blur(img, 'stack', k), True, 'bgr'),
+    },
+    'threshold': {
+        'global': (lambda img, k: ops.threshold(img, 'global'), False, 'gray'),
+        'otsu': (lambda img, k: ops.threshold(img, 'otsu'), False, 'gray'),
+        'adaptive_mean': (lambda img, k: ops.threshold(img, 'adaptive_mean', block_size=k), True, 'gray'),
+        'adaptive_gaussian': (lambda img, k: ops.threshold(img, 'adaptive_gaussian', block_size=k), True, 'gray'),
+    },
+    'canny': {
+        'aperture3': (lambda img, k: ops.canny(img, aperture=3), False, 'gray'),
+        'aperture5': (lambda img, k: ops.canny(img, aperture=5), False, 'gray'),
+        'aperture7': (lambda img, k: ops.canny(img, aperture=7), False, 'gray'),
+        'aperture3_l2': (lambda img, k: ops.canny(img, aperture=3, l2_gradient=True), False, 'gray'),
+    },
+    'morphology': {
+        'dilate': (lambda img, k: ops.morphology(img, 'dilate', k), True, 'binary'),
+        'erode': (lambda img, k: ops.morphology(img, 'erode', k), True, 'binary'),
+    },
+    'contours': {
+        'external': (lambda img, k: ops.contours(img, 'external'), False, 'binary'),
+        'tree': (lambda img, k: ops.contours(img, 'tree'), False, 'binary'),
+    },
+}
+
+
+def make_inputs(base, resolution, dtype):
+    """BGR, grayscale and binary versions of the base image at one resolution and dtype"""
+    bgr = cv2.resize(base, RESOLUTIONS[resolution], interpolation=cv2.INTER_AREA)
+    gray = ops.to_gray(bgr)
+    binary = ops.threshold(gray, 'global', thresh=127, inverse=True)
+    scale = {np.uint8: 1, np.uint16: 257, np.float32: 1 / 255}[DTYPES[dtype]]
+    inputs = {'bgr': bgr, 'gray': gray, 'binary': binary}
+    # Scale in float32: a uint8 array times 257 overflows (and raises on numpy 2)
+    return {kind: (img.astype(np.float32) * scale).astype(DTYPES[dtype]) if scale != 1 else img.copy()
+            for kind, img in inputs.items()}
+
+
+def time_case(fn, image, ksize, repeat):
+    """Median wall time in milliseconds, or None when OpenCV rejects the input"""
+    try:
+        fn(image, ksize)  # warm-up
+    except cv2.error:
+        return None
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(image, ksize)
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1000
+
+
+def run(base, args):
+    results = []
+    for threads in args.threads:
+        cv2.setNumThreads(threads)
+        for resolution in args.resolutions:
+            width, height = RESOLUTIONS[resolution]
+            for dtype in args.dtypes:
+                inputs = make_inputs(base, resolution, dtype)
+                for group in args.groups:
+                    for variant, (fn, uses_kernel, kind) in CASES[group].items():
+                        for ksize in (args.kernels if uses_kernel else [None]):
+                            ms = time_case(fn, inputs[kind], ksize, args.repeat)
+                            results.append({
+                                'group': group,
+                                'variant': variant,
+                                'resolution': resolution,
+                                'dtype': dtype,
+                                'ksize': ksize,
+                                'threads': threads,
+                                'ms': ms,
+                                'mpix_per_s': None if ms is None else width * height / 1e6 / (ms / 1000),
+                            })
+    return results
+
+
+def print_table(results):
+    print(f"{'group':<11} {'variant':<18} {'res':>6} {'dtype':>8} {'k':>4} {'thr':>4} {'ms':>9} {'MPix/s':>9}")
+    for r in results:
+        ksize = '-' if r['ksize'] is None else r['ksize']
+        if r['ms'] is None:
+            ms, rate = 'n/a', 'n/a'
+        else:
+            ms, rate = f"{r['ms']:.3f}", f"{r['mpix_per_s']:.1f}"
+        print(f"{r['group']:<11} {r['variant']:<18} {r['resolution']:>6} {r['dtype']:>8} {ksize:>4} "
+              f"{r['threads']:>4} {ms:>9} {rate:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmark of the OpenCV operations in this folder')
+    parser.add_argument("--image", default='./data/freelancer image.jpg',
+                        help='Base image, resized to each resolution')
+    parser.add_argument("--groups", nargs='+', default=list(CASES), choices=list(CASES),
+                        help='Operation groups to run (default: all)')
+    parser.add_argument("--resolutions", nargs='+', default=['480p', '1080p'], choices=list(RESOLUTIONS),
+                        help='Resolutions to sweep (default: 480p 1080p)')
+    parser.add_argument("--kernels", nargs='+', type=int, default=[3, 7, 15],
+                        help='Kernel / block sizes to sweep, odd values (default: 3 7 15)')
+    parser.add_argument("--dtypes", nargs='+', default=['uint8'], choices=list(DTYPES),
+                        help='Image data types to sweep (default: uint8)')
+    parser.add_argument("--threads", nargs='+', type=int, default=[1, cv2.getNumThreads()],
+                        help='cv2.setNumThreads values to sweep (default: 1 and the OpenCV default)')
+    parser.add_argument("--repeat", type=int, default=10,
+                        help='Timed runs per case (default: 10)')
+    parser.add_argument("--json", default=None,
+                        help='Also write results to this JSON file')
+
+    args = parser.parse_args()
+    args.threads = list(dict.fromkeys(args.threads))
+
+    base = cv2.imread(args.image)
+    if base is None:
+        print(f"Error: Could not load image from {args.image}")
+        return
+
+    results = run(base, args)
+    print_table(results)
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w') as f:
+            json.dump({'opencv': cv2.__version__, 'results': results}, f, indent=2)
+        print(f"Results saved to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import cv2
+import numpy as np
+
+# Reusable versions of the operations demonstrated by the scripts in this folder.
+# Defaults match the values those scripts use.
+
+COLOR_CODES = {
+    'gray': cv2.COLOR_BGR2GRAY,
+    'rgb': cv2.COLOR_BGR2RGB,
+    'hsv': cv2.COLOR_BGR2HSV,
+}
+
+
+def to_gray(image):
+    if image.ndim == 3:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return image
+
+
+def convert(image, code='gray'):
+    """Colour space conversion, as in colorspace.py"""
+    return cv2.cvtColor(image, COLOR_CODES[code])
+
+
+def blur(image, method='box', ksize=7, sigma=3):
+    """Box, Gaussian, median or stack blur with a square kernel, as in blur.py"""
+    if method == 'box':
+        return cv2.blur(image, (ksize, ksize))
+    if method == 'gaussian':
+        return cv2.GaussianBlur(image, (ksize, ksize), sigma)
+    if method == 'median':
+        return cv2.medianBlur(image, ksize)
+    if method == 'stack':
+        return cv2.stackBlur(image, (ksize, ksize))
+    raise ValueError(f"Unknown blur method: {method}")
+
+
+def threshold(image, method='global', thresh=60, block_size=21, c=30, inverse=False):
+    """
+    Global, Otsu or adaptive (mean/gaussian) threshold of the grayscale image,
+    as in threshold_global.py and threshold_adaptive.py.
+    """
+    gray = to_gray(image)
+    kind = cv2.THRESH_BINARY_INV if inverse else cv2.THRESH_BINARY
+    if method == 'global':
+        return cv2.threshold(gray, thresh, 255, kind)[1]
+    if method == 'otsu':
+        return cv2.threshold(gray, 0, 255, kind | cv2.THRESH_OTSU)[1]
+    if method == 'adaptive_mean':
+        return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, kind, block_size, c)
+    if method == 'adaptive_gaussian':
+        return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, kind, block_size, c)
+    raise ValueError(f"Unknown threshold method: {method}")
+
+
+def canny(image, low=100, high=300, aperture=3, l2_gradient=False):
+    """Canny edges, as in edge_detection.py"""
+    return cv2.Canny(image, low, high, apertureSize=aperture, L2gradient=l2_gradient)
+
+
+def morphology(image, op='dilate', ksize=3):
+    """Dilation or erosion with a square kernel, as in edge_detection.py"""
+    kernel = np.ones((ksize, ksize), dtype=np.uint8)
+    if op == 'dilate':
+        return cv2.dilate(image, kernel)
+    if op == 'erode':
+        return cv2.erode(image, kernel)
+    raise ValueError(f"Unknown morphology op: {op}")
+
+
+def contours(binary, mode='tree'):
+    """
+    Contours of a binary image and their bounding boxes, as in contours.py.
+    Returns (contours, boxes) with boxes an (n, 4) int32 array of x, y, w, h.
+    """
+    retrieval = cv2.RETR_TREE if mode == 'tree' else cv2.RETR_EXTERNAL
+    found, _ = cv2.findContours(binary, retrieval, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = np.array([cv2.boundingRect(cnt) for cnt in found], dtype=np.int32).reshape(-1, 4)
+    return found, boxes
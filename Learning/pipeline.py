@@ -0,0 +1,209 @@
+import argparse
+import collections
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+import operations as ops
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tif', '.tiff')
+
+# Stages that map an image to an image
+IMAGE_STAGES = {
+    'convert': ops.convert,
+    'blur': ops.blur,
+    'threshold': ops.threshold,
+    'canny': ops.canny,
+    'morphology': ops.morphology,
+}
+
+# Set in each worker by _init_worker
+_stages = None
+_output_dir = None
+_input_dir = None
+
+
+def _parse_value(text):
+    lowered = text.lower()
+    if lowered in ('true', 'false'):
+        return lowered == 'true'
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_stage(spec):
+    """Parses 'name:key=value,key=value' into (name, kwargs)"""
+    name, _, params = spec.partition(':')
+    if name not in IMAGE_STAGES and name != 'contours':
+        raise ValueError(f"Unknown stage: {name}")
+    kwargs = {}
+    for item in filter(None, params.split(',')):
+        key, _, value = item.partition('=')
+        kwargs[key.strip()] = _parse_value(value.strip())
+    return name, kwargs
+
+
+def load_pipeline(path):
+    """
+    Loads a JSON pipeline such as
+    [{"stage": "convert", "code": "gray"}, {"stage": "threshold", "method": "otsu"}, {"stage": "contours"}]
+    """
+    with open(path) as f:
+        spec = json.load(f)
+    stages = []
+    for entry in spec:
+        entry = dict(entry)
+        name = entry.pop('stage')
+        parse_stage(name)  # validates the name
+        stages.append((name, entry))
+    return stages
+
+
+def iter_images(input_dir):
+    """Lazily walks input_dir so the path list is never held in memory"""
+    for root, _dirs, files in os.walk(input_dir):
+        for filename in sorted(files):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(root, filename)
+
+
+def iter_batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_stages(image, stages):
+    """Applies the stages in order; a contours stage records boxes and passes the image through"""
+    boxes = None
+    for name, kwargs in stages:
+        if name == 'contours':
+            _, found = ops.contours(image, **kwargs)
+            boxes = found.tolist()
+        else:
+            image = IMAGE_STAGES[name](image, **kwargs)
+    return image, boxes
+
+
+def _init_worker(stages, input_dir, output_dir):
+    global _stages, _input_dir, _output_dir
+    _stages, _input_dir, _output_dir = stages, input_dir, output_dir
+    # Parallelism comes from the pool, so keep OpenCV from oversubscribing cores
+    cv2.setNumThreads(1)
+
+
+def _process_batch(paths):
+    """Runs in a worker: reads, processes and writes each image, returning only small results"""
+    results = []
+    for path in paths:
+        image = cv2.imread(path)
+        if image is None:
+            results.append({'path': path, 'error': 'unreadable'})
+            continue
+
+        try:
+            output, boxes = run_stages(image, _stages)
+        except cv2.error as e:
+            # One bad image must not abort the whole run
+            results.append({'path': path, 'error': str(e)})
+            continue
+        record = {'path': path, 'shape': list(image.shape)}
+        if boxes is not None:
+            record['boxes'] = boxes
+
+        if _output_dir is not None:
+            output_path = os.path.join(_output_dir, os.path.relpath(path, _input_dir))
+            try:
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                written = cv2.imwrite(output_path, output)
+            except (OSError, cv2.error):
+                written = False
+            if not written:
+                results.append({'path': path, 'error': f'could not write {output_path}'})
+                continue
+            record['output'] = output_path
+        results.append(record)
+    return results
+
+
+def run_pipeline(input_dir, stages, output_dir=None, workers=None, batch_size=16, prefetch=4):
+    """
+    Streams batches of image paths through a process pool.
+
+    At most prefetch * workers batches are in flight, so memory stays constant
+    regardless of dataset size. Yields result lists in input order.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max(1, prefetch * workers)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(stages, input_dir, output_dir)) as pool:
+        pending = collections.deque()
+        for batch in iter_batches(iter_images(input_dir), batch_size):
+            pending.append(pool.submit(_process_batch, batch))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a chain of OpenCV operations over a directory of images')
+    parser.add_argument("--input", required=True,
+                        help='Input directory, searched recursively')
+    parser.add_argument("--stages", nargs='+', default=None,
+                        help="Stages as name:key=value,..., e.g. convert:code=gray blur:method=gaussian,ksize=7 "
+                             "threshold:method=otsu,inverse=true contours")
+    parser.add_argument("--pipeline", default=None,
+                        help='JSON file describing the stages (instead of --stages)')
+    parser.add_argument("--output", default=None,
+                        help='Directory for processed images (optional)')
+    parser.add_argument("--results", default='results.jsonl',
+                        help='JSON Lines file for per-image results (default: results.jsonl)')
+    parser.add_argument("--workers", type=int, default=None,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument("--batch-size", type=int, default=16,
+                        help='Images per task sent to a worker (default: 16)')
+    parser.add_argument("--prefetch", type=int, default=4,
+                        help='Batches in flight per worker (default: 4)')
+
+    args = parser.parse_args()
+
+    if args.pipeline:
+        stages = load_pipeline(args.pipeline)
+    elif args.stages:
+        stages = [parse_stage(spec) for spec in args.stages]
+    else:
+        print("Error: Please provide --stages or --pipeline")
+        return
+
+    start = time.perf_counter()
+    count = errors = 0
+    with open(args.results, 'w') as out:
+        for results in run_pipeline(args.input, stages, args.output, args.workers,
+                                    args.batch_size, args.prefetch):
+            # One write per batch keeps result I/O off the per-image path
+            out.write(''.join(json.dumps(r) + '\n' for r in results))
+            count += len(results)
+            errors += sum('error' in r for r in results)
+
+    elapsed = time.perf_counter() - start
+    print(f"Processed {count} image(s) ({errors} failed) in {elapsed:.1f}s "
+          f"({count / elapsed if elapsed else 0:.1f} images/s)")
+    print(f"Results saved to: {args.results}")
+
+
+if __name__ == "__main__":
+    main()
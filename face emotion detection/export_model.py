@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import pickle
+import subprocess
+import sys
+
+from fast_model import export_model
+
+# Run in a fresh interpreter so each loader is measured from a cold start
+COLD_START_SNIPPET = """
+import json, pickle, resource, sys, time
+
+def rss_mb():
+    # ru_maxrss survives exec() from the parent, so prefer this process's own VmRSS
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+start = time.perf_counter()
+import numpy as np
+if sys.argv[1] == 'pickle':
+    with open(sys.argv[2], 'rb') as f:
+        model = pickle.load(f)
+else:
+    sys.path.insert(0, sys.argv[3])
+    from fast_model import FlatForest
+    model = FlatForest(sys.argv[2])
+loaded = time.perf_counter()
+model.predict(np.zeros((1, model.n_features_in_)))
+predicted = time.perf_counter()
+print(json.dumps({
+    'load_s': loaded - start,
+    'first_predict_s': predicted - loaded,
+    'rss_mb': rss_mb(),
+}))
+"""
+
+
+def cold_start(kind, path, runs):
+    results = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', COLD_START_SNIPPET, kind, path,
+                                          os.path.dirname(os.path.abspath(__file__))])
+        results.append(json.loads(output))
+    # Report the best run to keep disk-cache noise out of the comparison
+    return min(results, key=lambda r: r['load_s'] + r['first_predict_s'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the emotion model as a memory-mappable forest')
+    parser.add_argument("--model", default='./model4',
+                        help='Path to the pickled RandomForestClassifier')
+    parser.add_argument("--output", default=None,
+                        help='Output path (default: <model>.rfa)')
+    parser.add_argument("--benchmark", action='store_true',
+                        help='Compare cold-start time and RSS against the pickle')
+    parser.add_argument("--runs", type=int, default=5,
+                        help='Cold-start runs per format (default: 5)')
+
+    args = parser.parse_args()
+    output_path = args.output or args.model + '.rfa'
+
+    with open(args.model, 'rb') as f:
+        model = pickle.load(f)
+
+    export_model(model, output_path)
+    print(f"Exported {len(model.estimators_)} trees to: {output_path}")
+
+    if args.benchmark:
+        print(f"{'format':<8} {'load ms':>10} {'1st predict ms':>15} {'RSS MB':>8}")
+        for kind, path in [('pickle', args.model), ('flat', output_path)]:
+            r = cold_start(kind, path, args.runs)
+            print(f"{kind:<8} {r['load_s'] * 1000:>10.1f} {r['first_predict_s'] * 1000:>15.1f} "
+                  f"{r['rss_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
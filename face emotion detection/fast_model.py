@@ -0,0 +1,159 @@
+import json
+import os
+import pickle
+import struct
+
+import numpy as np
+
+MAGIC = b'RFA1'
+ALIGNMENT = 64
+# Array layout of the flattened forest: name -> dtype
+ARRAYS = [
+    ('roots', np.int32),
+    ('feature', np.int32),
+    ('threshold', np.float64),
+    ('left', np.int32),
+    ('right', np.int32),
+    ('value', np.float64),
+]
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def flatten_forest(model):
+    """
+    Flattens a fitted RandomForestClassifier into contiguous node arrays.
+    Children indices are global, and leaves point to themselves with an
+    infinite threshold so every tree can be walked for a fixed number of steps.
+    """
+    roots, features, thresholds, lefts, rights, values = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        index = np.arange(n, dtype=np.int64) + offset
+        is_leaf = tree.children_left < 0
+
+        roots.append(offset)
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+        lefts.append(np.where(is_leaf, index, tree.children_left + offset))
+        rights.append(np.where(is_leaf, index, tree.children_right + offset))
+
+        # Per-tree class probabilities, as RandomForestClassifier.predict_proba averages them
+        value = tree.value[:, 0, :]
+        totals = value.sum(axis=1, keepdims=True)
+        values.append(value / np.where(totals == 0, 1, totals))
+
+        max_depth = max(max_depth, tree.max_depth)
+        offset += n
+
+    arrays = {
+        'roots': np.asarray(roots),
+        'feature': np.concatenate(features),
+        'threshold': np.concatenate(thresholds),
+        'left': np.concatenate(lefts),
+        'right': np.concatenate(rights),
+        'value': np.concatenate(values),
+    }
+    arrays = {name: np.ascontiguousarray(arrays[name], dtype=dtype) for name, dtype in ARRAYS}
+
+    meta = {
+        'n_features': int(model.n_features_in_),
+        'n_trees': len(model.estimators_),
+        'max_depth': int(max_depth),
+        'classes': [c.item() for c in model.classes_],
+    }
+    return meta, arrays
+
+
+def export_model(model, output_path):
+    """Writes a fitted forest as a header followed by 64-byte aligned arrays"""
+    meta, arrays = flatten_forest(model)
+
+    # Header size depends on the offsets it contains, so lay out twice
+    layout = {}
+    header = b''
+    for _ in range(2):
+        offset = _align(len(MAGIC) + 4 + len(header))
+        for name, _dtype in ARRAYS:
+            array = arrays[name]
+            layout[name] = {'offset': offset, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+            offset = _align(offset + array.nbytes)
+        header = json.dumps(dict(meta, arrays=layout)).encode('utf-8')
+
+    with open(output_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        for name, _dtype in ARRAYS:
+            f.write(b'\0' * (layout[name]['offset'] - f.tell()))
+            f.write(arrays[name].tobytes())
+
+    return output_path
+
+
+class FlatForest:
+    """Read-only forest backed by a memory-mapped export file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a flattened forest file")
+            header_len, = struct.unpack('<I', f.read(4))
+            meta = json.loads(f.read(header_len).decode('utf-8'))
+
+        # The mapping is shared page-for-page between processes loading the same file
+        self._buffer = np.memmap(path, dtype=np.uint8, mode='r')
+        for name, info in meta['arrays'].items():
+            dtype = np.dtype(info['dtype'])
+            count = int(np.prod(info['shape']))
+            array = np.frombuffer(self._buffer, dtype=dtype, count=count, offset=info['offset'])
+            setattr(self, name, array.reshape(info['shape']))
+
+        self.n_features_in_ = meta['n_features']
+        self.n_trees = meta['n_trees']
+        self.max_depth = meta['max_depth']
+        self.classes_ = np.asarray(meta['classes'])
+
+    def predict_proba(self, X):
+        # sklearn trees compare float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected input of shape (n_samples, {self.n_features_in_}), got {X.shape}")
+
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.repeat(self.roots[None, :], X.shape[0], axis=0)
+
+        # Walk all trees for all samples at once; leaves loop onto themselves
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return self.value[nodes].mean(axis=1)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def load_model(model_path='./model4'):
+    """
+    Loads the flattened export at `model_path`.rfa when it exists and is not
+    older than the pickle, otherwise falls back to unpickling `model_path`.
+    """
+    flat_path = model_path + '.rfa'
+    if os.path.exists(flat_path):
+        # A stale export would silently serve an outdated model
+        stale = os.path.exists(model_path) and os.path.getmtime(flat_path) < os.path.getmtime(model_path)
+        if not stale:
+            try:
+                return FlatForest(flat_path)
+            except (ValueError, KeyError, struct.error, OSError):
+                pass  # Truncated or corrupt export
+
+    with open(model_path, 'rb') as f:
+        return pickle.load(f)
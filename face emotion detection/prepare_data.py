@@ -1,14 +1,32 @@
+import json
 import os
-import cv2
 import numpy as np
 from utils import get_face_landmarks
 
 data_dir = './data'
+data_file = 'data4.txt'
+# Emotion folders and every image already processed, so update_model.py can
+# extract features for new images only
+manifest_file = 'data4_manifest.json'
 
-output = []
-for emotion_indx, emotion in enumerate(sorted(os.listdir(data_dir))):
-    for image_path_ in os.listdir(os.path.join(data_dir, emotion)):
-        image_path = os.path.join(data_dir, emotion, image_path_)
+
+def list_images(data_dir):
+    """Returns the sorted emotion folders and (emotion index, relative path) for every image"""
+    emotions = sorted(os.listdir(data_dir))
+    images = []
+    for emotion_indx, emotion in enumerate(emotions):
+        for image_path_ in sorted(os.listdir(os.path.join(data_dir, emotion))):
+            images.append((emotion_indx, os.path.join(emotion, image_path_)))
+    return emotions, images
+
+
+def extract_features(data_dir, images):
+    """Landmark rows (1404 features + label) for images where exactly one face was found"""
+    import cv2
+
+    output = []
+    for emotion_indx, image_path_ in images:
+        image_path = os.path.join(data_dir, image_path_)
 
         image = cv2.imread(image_path)
 
@@ -17,6 +35,23 @@ for emotion_indx, emotion in enumerate(sorted(os.listdir(data_dir))):
         if len(face_landmarks) == 1404:
             face_landmarks.append(int(emotion_indx))
             output.append(face_landmarks)
+    return output
+
+
+def save_manifest(path, emotions, image_paths):
+    with open(path, 'w') as f:
+        json.dump({'emotions': emotions, 'images': image_paths}, f, indent=1)
+
+
+def load_manifest(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    emotions, images = list_images(data_dir)
+    output = extract_features(data_dir, images)
 
-np.savetxt('data4.txt', np.asarray(output))
-print("Done")
\ No newline at end of file
+    np.savetxt(data_file, np.asarray(output))
+    save_manifest(manifest_file, emotions, [p for _, p in images])
+    print("Done")
@@ -1,14 +1,13 @@
-import pickle
-
 import cv2
 
+from fast_model import load_model
 from utils import get_face_landmarks
 
 
 emotions = ['HAPPY', 'NEUTRAL', 'SAD']
 
-with open('./model4', 'rb') as f:
-    model = pickle.load(f)
+# Uses the memory-mapped ./model4.rfa export when present, else the pickle
+model = load_model('./model4')
 
 cap = cv2.VideoCapture(0)
 
@@ -5,6 +5,8 @@ from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, confusion_matrix
 
+from fast_model import export_model
+
 # Load data from the text file
 data_file = "data4.txt"
 data = np.loadtxt(data_file)
@@ -32,4 +34,7 @@ print(f"Accuracy: {accuracy * 100:.2f}%")
 print(confusion_matrix(y_test, y_pred))
 
 with open('./model4', 'wb') as f:
-    pickle.dump(rf_classifier, f)
\ No newline at end of file
+    pickle.dump(rf_classifier, f)
+
+# Flattened, memory-mappable copy for fast startup in test_model.py
+export_model(rf_classifier, './model4.rfa')
\ No newline at end of file
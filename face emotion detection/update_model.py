@@ -0,0 +1,135 @@
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+
+from fast_model import export_model
+from prepare_data import extract_features, list_images, load_manifest, save_manifest
+
+
+def warm_start(model, X, y, add_trees):
+    """
+    Grows a fitted forest in place by add_trees trees fitted on X, y; the existing trees are kept as they are.
+    """
+    model.set_params(warm_start=True, n_estimators=model.n_estimators + add_trees)
+    model.fit(X, y)
+    return model
+
+
+def split_new_rows(rows, test_size, random_state):
+    """Holds out part of the new rows; neither the updated nor a retrained model sees them"""
+    from sklearn.model_selection import train_test_split
+
+    if test_size <= 0 or len(rows) < 2:
+        return rows, rows[:0]
+    try:
+        return train_test_split(rows, test_size=test_size, stratify=rows[:, -1],
+                                random_state=random_state, shuffle=True)
+    except ValueError:
+        # Too few rows of some emotion to stratify
+        return train_test_split(rows, test_size=test_size, random_state=random_state, shuffle=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add new labelled images and warm-start the emotion model')
+    parser.add_argument("--data-dir", default='./data',
+                        help='Training images, one folder per emotion (default: ./data)')
+    parser.add_argument("--data-file", default='data4.txt',
+                        help='Feature file written by prepare_data.py (default: data4.txt)')
+    parser.add_argument("--manifest", default='data4_manifest.json',
+                        help='Images already in the feature file (default: data4_manifest.json)')
+    parser.add_argument("--model", default='./model4',
+                        help='Pickled model to update (default: ./model4)')
+    parser.add_argument("--add-trees", type=int, default=20,
+                        help='Trees added per update (default: 20)')
+    parser.add_argument("--max-trees", type=int, default=300,
+                        help='Suggest a full retrain once the forest is this large (default: 300)')
+    parser.add_argument("--test-size", type=float, default=0.2,
+                        help='Fraction of the new images held out to measure accuracy (default: 0.2)')
+    parser.add_argument("--compare", action='store_true',
+                        help='Also retrain from scratch on the same data and report the accuracy drift')
+    parser.add_argument("--random-state", type=int, default=42,
+                        help='Seed for the held-out split (default: 42)')
+
+    args = parser.parse_args()
+
+    # Imported after argument parsing so --help and early errors stay fast
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score
+
+    if not os.path.exists(args.manifest):
+        print(f"Error: {args.manifest} not found, run prepare_data.py once for a full build")
+        return
+
+    manifest = load_manifest(args.manifest)
+    emotions, images = list_images(args.data_dir)
+    if emotions != manifest['emotions']:
+        # Labels are folder indices, so a new emotion shifts them and the model cannot be updated
+        print(f"Error: emotion folders changed ({manifest['emotions']} -> {emotions}), "
+              f"run prepare_data.py and train_model.py for a full rebuild")
+        return
+
+    seen = set(manifest['images'])
+    new_images = [(label, path) for label, path in images if path not in seen]
+    if not new_images:
+        print("No new images")
+        return
+
+    start = time.perf_counter()
+    new_rows = np.asarray(extract_features(args.data_dir, new_images)).reshape(-1, 1405)
+    extract_time = time.perf_counter() - start
+    print(f"New images: {len(new_images)}, with a face: {len(new_rows)} ({extract_time:.1f}s)")
+
+    if len(new_rows):
+        old_rows = np.loadtxt(args.data_file).reshape(-1, 1405)
+        train_rows, test_rows = split_new_rows(new_rows, args.test_size, args.random_state)
+        X = np.vstack([old_rows[:, :-1], train_rows[:, :-1]])
+        y = np.concatenate([old_rows[:, -1], train_rows[:, -1]])
+
+        X_test, y_test = test_rows[:, :-1], test_rows[:, -1]
+
+        with open(args.model, 'rb') as f:
+            model = pickle.load(f)
+        if len(test_rows):
+            before = accuracy_score(y_test, model.predict(X_test))
+
+        n_trees = model.n_estimators
+        start = time.perf_counter()
+        updated = warm_start(model, X, y, args.add_trees)
+        update_time = time.perf_counter() - start
+        print(f"Warm start: {n_trees} -> {updated.n_estimators} trees ({update_time:.1f}s)")
+
+        if len(test_rows):
+            after = accuracy_score(y_test, updated.predict(X_test))
+            print(f"Accuracy on {len(test_rows)} held-out new images: "
+                  f"{before * 100:.2f}% before, {after * 100:.2f}% after update")
+
+            if args.compare:
+                # Same settings as train_model.py
+                start = time.perf_counter()
+                full = RandomForestClassifier().fit(X, y)
+                full_time = time.perf_counter() - start
+                retrained = accuracy_score(y_test, full.predict(X_test))
+                print(f"Full retrain: {retrained * 100:.2f}% ({full_time:.1f}s), "
+                      f"drift of the updated model: {(after - retrained) * 100:+.2f} points")
+
+        if updated.n_estimators >= args.max_trees:
+            print(f"Forest has {updated.n_estimators} trees, consider a full retrain with train_model.py")
+
+        with open(args.model, 'wb') as f:
+            pickle.dump(updated, f)
+        export_model(updated, f"{args.model}.rfa")
+
+        # Append only the new rows; held-out rows are trained on in the next update
+        with open(args.data_file, 'ab') as f:
+            np.savetxt(f, new_rows)
+
+    # Images without a face are recorded too so they are not processed again
+    save_manifest(args.manifest, emotions, manifest['images'] + [p for _, p in new_images])
+    print("Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,19 @@
-import cv2
-import mediapipe as mp
+# FaceMesh is built once, on first use, and reused for efficiency
+face_mesh = None
 
-# Initialize FaceMesh globally for efficiency
-mp_face_mesh = mp.solutions.face_mesh
-face_mesh = mp_face_mesh.FaceMesh(static_image_mode=True,
-                                  max_num_faces=1,
-                                  min_detection_confidence=0.5)
+
+def get_face_mesh():
+    """
+    Returns the shared FaceMesh graph, importing mediapipe and building it on first call.
+    """
+    global face_mesh
+    if face_mesh is None:
+        import mediapipe as mp
+
+        face_mesh = mp.solutions.face_mesh.FaceMesh(static_image_mode=True,
+                                                    max_num_faces=1,
+                                                    min_detection_confidence=0.5)
+    return face_mesh
 
 def get_face_landmarks(image, draw=False):
     """
@@ -14,6 +22,9 @@ def get_face_landmarks(image, draw=False):
     if image is None:
         return []  # Image could not be read
 
+    # Deferred like mediapipe, so importing utils stays cheap
+    import cv2
+
     # Check and convert grayscale to RGB
     if len(image.shape) == 2:  # Grayscale
         image_input_rgb = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
@@ -22,7 +33,7 @@ def get_face_landmarks(image, draw=False):
     else:
         return []  # Unsupported image format
 
-    results = face_mesh.process(image_input_rgb)
+    results = get_face_mesh().process(image_input_rgb)
 
     image_landmarks = []
 
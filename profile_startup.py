@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# (project folder, module, initialization run after import with the module bound to `m`)
+MODULES = [
+    ('Face Anonymizer', 'blur_backend',
+     "import numpy as np; m.FaceBlurProcessor().count_faces(np.zeros((128, 128, 3), np.uint8))"),
+    # Streamlit frontend cold start: page render with no upload, in bare mode
+    ('Face Anonymizer', 'frontend', "m.main()"),
+    ('face emotion detection', 'prepare_data', None),
+    ('face emotion detection', 'utils', "m.get_face_mesh()"),
+    ('face emotion detection', 'fast_model', None),
+    ('yellow object detection', 'util', "m.get_limits([0, 255, 255])"),
+]
+
+# Entry points timed end to end with --help, i.e. interpreter start to argument parsing.
+# test_model.py, prepare_data.py and train_model.py take no arguments and would open the
+# webcam or run a full build, so only their imports are covered, via the MODULES above
+SCRIPTS = [
+    ('Face Anonymizer', 'blur_backend.py'),
+    ('Face Anonymizer', 'blur_image.py'),
+    ('Face Anonymizer', 'blur_webcam.py'),
+    ('Face Anonymizer', 'compare_detectors.py'),
+    ('Face Anonymizer', 'scheduler.py'),
+    ('face emotion detection', 'export_model.py'),
+    ('face emotion detection', 'update_model.py'),
+]
+
+MODULE_SNIPPET = """
+import importlib, json, sys, time
+start = time.perf_counter()
+m = importlib.import_module(sys.argv[1])
+imported = time.perf_counter()
+result = {'import_s': imported - start, 'init_s': None, 'error': None}
+if sys.argv[2]:
+    try:
+        exec(sys.argv[2])
+        result['init_s'] = time.perf_counter() - imported
+    except Exception as e:
+        result['error'] = f'{type(e).__name__}: {e}'
+print(json.dumps(result))
+"""
+
+
+def heaviest_imports(importtime_log, top):
+    """Top-level imports from a -X importtime log, sorted by cumulative microseconds"""
+    imports = []
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # Nested imports are indented under their parent
+        if name.startswith('  ') or not name.strip():
+            continue
+        imports.append((name.strip(), int(cumulative_us) / 1e6))
+    imports.sort(key=lambda item: item[1], reverse=True)
+    return imports[:top]
+
+
+def profile_module(folder, module, init, top):
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', MODULE_SNIPPET, module, init or ''],
+                          cwd=os.path.join(ROOT, folder), capture_output=True, text=True)
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed'
+        return {'import_s': None, 'init_s': None, 'error': error, 'heaviest': []}
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['heaviest'] = heaviest_imports(proc.stderr, top)
+    return result
+
+
+def profile_script(folder, script):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, script, '--help'],
+                          cwd=os.path.join(ROOT, folder), capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    error = None
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed'
+    return {'startup_s': elapsed, 'error': error}
+
+
+def _ms(seconds):
+    return '-' if seconds is None else f"{seconds * 1000:.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report import and initialization time of each module')
+    parser.add_argument("--top", type=int, default=3,
+                        help='Heaviest top-level imports to list per module (default: 3)')
+    parser.add_argument("--json", action='store_true',
+                        help='Print results as JSON instead of a table')
+
+    args = parser.parse_args()
+
+    modules = [dict(folder=folder, module=module, **profile_module(folder, module, init, args.top))
+               for folder, module, init in MODULES]
+    scripts = [dict(folder=folder, script=script, **profile_script(folder, script))
+               for folder, script in SCRIPTS]
+
+    if args.json:
+        print(json.dumps({'modules': modules, 'scripts': scripts}, indent=2))
+        return
+
+    print(f"{'module':<42} {'import ms':>10} {'init ms':>10}  heaviest imports")
+    for r in modules:
+        heaviest = ', '.join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in r['heaviest'])
+        print(f"{r['folder'] + '/' + r['module']:<42} {_ms(r['import_s']):>10} {_ms(r['init_s']):>10}  "
+              f"{r['error'] or heaviest}")
+
+    print()
+    print(f"{'script --help':<42} {'startup ms':>10}")
+    for r in scripts:
+        print(f"{r['folder'] + '/' + r['script']:<42} {_ms(r['startup_s']):>10}  {r['error'] or ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import argparse
+import json
+import time
+
+import numpy as np
+import cv2
+from util import COLORS, get_limits
+from tracker import ColorTracker, RoiSearch, find_blobs
+from sources import SyntheticSource, open_source
+
+
+def box_iou(a, b):
+    """IoU matrix between (n, 4) and (m, 4) arrays of exclusive boxes"""
+    a = a[:, None, :].astype(np.float64)
+    b = b[None, :, :].astype(np.float64)
+    w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = w * h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / (area_a + area_b - inter)
+
+
+def match(predicted, truth, threshold=0.5):
+    """Greedy one-to-one matching by IoU; returns (true positives, matched IoUs)"""
+    if len(predicted) == 0 or len(truth) == 0:
+        return 0, []
+    iou = box_iou(predicted, truth)
+    ious = []
+    while iou.size and iou.max() >= threshold:
+        i, j = np.unravel_index(np.argmax(iou), iou.shape)
+        ious.append(iou[i, j])
+        iou[i, :] = -1
+        iou[:, j] = -1
+    return len(ious), ious
+
+
+def best_ms(fn, repeat):
+    """Best-of-repeat wall time in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def compare_threshold(frame, colors, repeat=40):
+    """
+    Threshold stage only (HSV in, 0/255 masks out): one cv2.inRange per colour,
+    as main.py did before ColorTracker, against ColorTracker for the first
+    colour alone and for all colours.
+    """
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    with np.errstate(over='ignore'):  # get_limits wraps hues near 0, as it always has
+        limits = [get_limits(color) for color in colors.values()]
+    first = dict(list(colors.items())[:1])
+    single, multi = ColorTracker(first), ColorTracker(colors)
+
+    def tracker_masks(tracker):
+        labels = tracker.classify_hsv(hsv)
+        return [tracker.mask(labels, name) for name in tracker.names]
+
+    n = len(colors)
+    return {
+        'inrange_1': best_ms(lambda: cv2.inRange(hsv, *limits[0]), repeat),
+        f'inrange_{n}': best_ms(lambda: [cv2.inRange(hsv, *lim) for lim in limits], repeat),
+        'tracker_1': best_ms(lambda: tracker_masks(single), repeat),
+        f'tracker_{n}': best_ms(lambda: tracker_masks(multi), repeat),
+    }
+
+
+def run(source, tracker, args):
+    stages = {'read': 0.0, 'convert': 0.0, 'threshold': 0.0, 'bbox': 0.0, 'detect': 0.0}
+    counts = {'frames': 0, 'predicted': 0, 'truth': 0, 'tp': 0}
+    ious = []
+    roi_search = RoiSearch(tracker, min_area=args.min_area, open_size=args.open_size,
+                           scale=args.scale, rescan_interval=args.rescan_interval) if args.roi else None
+
+    frames = iter(source)
+    while args.frames is None or counts['frames'] < args.frames:
+        t0 = time.perf_counter()
+        item = next(frames, None)
+        if item is None:
+            break
+        frame, truth = item
+        t1 = time.perf_counter()
+        stages['read'] += t1 - t0
+
+        if roi_search is not None:
+            detections = roi_search.detect(frame)
+            stages['detect'] += time.perf_counter() - t1
+        else:
+            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+            t2 = time.perf_counter()
+            labels = tracker.classify_hsv(hsv)
+            masks = {name: tracker.mask(labels, name) for name in tracker.names}
+            t3 = time.perf_counter()
+            detections = {name: find_blobs(mask, min_area=args.min_area, open_size=args.open_size)
+                          for name, mask in masks.items()}
+            t4 = time.perf_counter()
+            stages['convert'] += t2 - t1
+            stages['threshold'] += t3 - t2
+            stages['bbox'] += t4 - t3
+            stages['detect'] += t4 - t1
+
+        counts['frames'] += 1
+        if truth is not None:
+            for name, boxes in truth.items():
+                blobs = detections[name]
+                predicted = np.stack([blobs['x1'], blobs['y1'], blobs['x2'], blobs['y2']], axis=1)
+                tp, matched = match(predicted, boxes, args.iou)
+                counts['predicted'] += len(predicted)
+                counts['truth'] += len(boxes)
+                counts['tp'] += tp
+                ious.extend(matched)
+
+    n = max(counts['frames'], 1)
+    result = {
+        'frames': counts['frames'],
+        'fps': counts['frames'] / stages['detect'] if stages['detect'] else 0.0,
+        'latency_ms': {stage: seconds / n * 1000 for stage, seconds in stages.items()
+                       if not (args.roi and stage in ('convert', 'threshold', 'bbox'))},
+    }
+    if counts['truth']:
+        result['accuracy'] = {
+            'precision': counts['tp'] / counts['predicted'] if counts['predicted'] else 0.0,
+            'recall': counts['tp'] / counts['truth'],
+            'mean_iou': float(np.mean(ious)) if ious else 0.0,
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless throughput and accuracy benchmark for the colour detector')
+    parser.add_argument("--source", default='synthetic',
+                        help="Camera index, video file, image directory/glob or 'synthetic' (default: synthetic)")
+    parser.add_argument("--frames", type=int, default=300,
+                        help='Number of frames to process (default: 300)')
+    parser.add_argument("--width", type=int, default=1280,
+                        help='Synthetic frame width (default: 1280)')
+    parser.add_argument("--height", type=int, default=720,
+                        help='Synthetic frame height (default: 720)')
+    parser.add_argument("--objects-per-color", type=int, default=1,
+                        help='Synthetic objects per colour (default: 1)')
+    parser.add_argument("--colors", nargs='+', default=['yellow'], choices=list(COLORS),
+                        help='Target colours to track (default: yellow)')
+    parser.add_argument("--min-area", type=int, default=100,
+                        help='Minimum blob area in pixels (default: 100)')
+    parser.add_argument("--open-size", type=int, default=0,
+                        help='Morphological opening kernel size, 0 to disable (default: 0)')
+    parser.add_argument("--roi", action='store_true',
+                        help='Benchmark ROI search mode instead of full-frame detection')
+    parser.add_argument("--scale", type=float, default=0.25,
+                        help='Resolution scale of the full-frame scan in ROI mode (default: 0.25)')
+    parser.add_argument("--rescan-interval", type=int, default=30,
+                        help='Frames between full-frame scans in ROI mode (default: 30)')
+    parser.add_argument("--iou", type=float, default=0.5,
+                        help='IoU threshold for a correct detection (default: 0.5)')
+    parser.add_argument("--compare-threshold", action='store_true',
+                        help='Also time the threshold stage against one cv2.inRange per colour')
+    parser.add_argument("--threads", type=int, default=None,
+                        help='OpenCV thread count (default: OpenCV decides)')
+    parser.add_argument("--json", action='store_true',
+                        help='Print results as JSON instead of a table')
+
+    args = parser.parse_args()
+
+    if args.threads is not None:
+        cv2.setNumThreads(args.threads)
+
+    target_colors = {name: COLORS[name] for name in args.colors}
+    tracker = ColorTracker(target_colors)
+    if args.source == 'synthetic':
+        source = SyntheticSource(target_colors, width=args.width, height=args.height,
+                                 frames=args.frames, objects_per_color=args.objects_per_color)
+    else:
+        source = open_source(args.source, colors=target_colors)
+
+    if args.compare_threshold:
+        # Sources restart on each iteration, so the run below still sees this frame
+        frames = iter(source)
+        first = next(frames, None)
+        frames.close()
+        if first is None:
+            print(f"Error: No frames could be read from {args.source}")
+            return
+        threshold_ms = compare_threshold(first[0], target_colors)
+
+    result = run(source, tracker, args)
+    if args.compare_threshold:
+        result['threshold_ms'] = threshold_ms
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"Frames: {result['frames']}  Detection FPS: {result['fps']:.1f}")
+    for stage, ms in result['latency_ms'].items():
+        print(f"  {stage:<10} {ms:>8.3f} ms/frame")
+    if 'accuracy' in result:
+        acc = result['accuracy']
+        print(f"Precision: {acc['precision']:.3f}  Recall: {acc['recall']:.3f}  Mean IoU: {acc['mean_iou']:.3f}")
+    if 'threshold_ms' in result:
+        print("Threshold stage, best of 40:")
+        for name, ms in result['threshold_ms'].items():
+            print(f"  {name:<10} {ms:>8.3f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,67 @@
+import argparse
+import sys
+
 import cv2
-from util import get_limits
-from PIL import Image
+from util import COLORS
+from tracker import ColorTracker, RoiSearch
+from sources import open_source
+
+parser = argparse.ArgumentParser(description='Colour Object Detection')
+parser.add_argument("--source", default='0',
+                    help="Camera index, video file, image directory/glob or 'synthetic' (default: 0)")
+parser.add_argument("--headless", action='store_true',
+                    help='Run without a display window and print detections instead')
+parser.add_argument("--max-frames", type=int, default=None,
+                    help='Stop after this many frames')
+parser.add_argument("--colors", nargs='+', default=['yellow'], choices=list(COLORS),
+                    help='Target colours to track (default: yellow)')
+parser.add_argument("--min-area", type=int, default=100,
+                    help='Minimum blob area in pixels (default: 100)')
+parser.add_argument("--open-size", type=int, default=0,
+                    help='Morphological opening kernel size, 0 to disable (default: 0)')
+parser.add_argument("--roi", action='store_true',
+                    help='Search around the last known boxes instead of the full frame')
+parser.add_argument("--scale", type=float, default=0.25,
+                    help='Resolution scale of the periodic full-frame scan in ROI mode (default: 0.25)')
+parser.add_argument("--rescan-interval", type=int, default=30,
+                    help='Frames between full-frame scans in ROI mode (default: 30)')
+args = parser.parse_args()
+
+# Lookup tables for all target colours are built once, not per frame
+target_colors = {name: COLORS[name] for name in args.colors}
+tracker = ColorTracker(target_colors)
+roi_search = RoiSearch(tracker, min_area=args.min_area, open_size=args.open_size,
+                       scale=args.scale, rescan_interval=args.rescan_interval)
+# The synthetic source generates --max-frames frames, or its default count when unset
+source_options = {} if args.max_frames is None else {'frames': args.max_frames}
+try:
+    source = open_source(args.source, colors=target_colors, **source_options)
+except ValueError as e:
+    print(f"Error: {e}")
+    sys.exit(1)
 
-yellow = [0,255,255]
-cap = cv2.VideoCapture(0)
-while(True):
-    ret, frame = cap.read()
+for frame_index, (frame, _truth) in enumerate(source):
+    if args.max_frames is not None and frame_index >= args.max_frames:
+        break
+
+    if args.roi:
+        detections = roi_search.detect(frame)
+    else:
+        detections = tracker.detect(frame, min_area=args.min_area, open_size=args.open_size)
 
-    hsvImage = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-    lower,upper = get_limits(color=yellow)
-    mask = cv2.inRange(hsvImage,lower,upper)
-    mask_ = Image.fromarray(mask)
+    if args.headless:
+        counts = ', '.join(f"{name}: {len(blobs)}" for name, blobs in detections.items())
+        print(f"Frame {frame_index}: {counts}")
+        continue
 
-    bbox = mask_.getbbox()
-    if(bbox is not None):
-        x1,y1,x2,y2 = bbox
-        frame = cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),5)
+    for name, blobs in detections.items():
+        # One box per separate object
+        for x1, y1, x2, y2, area, cx, cy in blobs.tolist():
+            frame = cv2.rectangle(frame,(x1,y1),(x2,y2),COLORS[name],5)
 
     cv2.imshow('frame', frame)
     if cv2.waitKey(1) & 0xFF == ord('q'):
         break
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+
+if not args.headless:
+    cv2.destroyAllWindows()
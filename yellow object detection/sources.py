@@ -0,0 +1,115 @@
+import glob
+import os
+
+import numpy as np
+import cv2
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+
+class VideoSource:
+    """Frames from a camera index or a video file, via cv2.VideoCapture"""
+
+    def __init__(self, target):
+        self.target = target
+
+    def __iter__(self):
+        cap = cv2.VideoCapture(self.target)
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield frame, None
+        finally:
+            cap.release()
+
+
+class ImageSequenceSource:
+    """Frames from a directory of images or a glob pattern, in sorted order"""
+
+    def __init__(self, pattern):
+        if os.path.isdir(pattern):
+            paths = [os.path.join(pattern, f) for f in os.listdir(pattern)]
+        else:
+            paths = glob.glob(pattern)
+        self.paths = sorted(p for p in paths if p.lower().endswith(IMAGE_EXTENSIONS))
+
+    def __iter__(self):
+        for path in self.paths:
+            frame = cv2.imread(path)
+            if frame is not None:
+                yield frame, None
+
+
+class SyntheticSource:
+    """
+    Coloured shapes bouncing over a low-saturation noisy background.
+
+    Yields each frame with its ground truth: a dict mapping colour name to an
+    (n, 4) array of exclusive (x1, y1, x2, y2) boxes.
+    """
+
+    def __init__(self, colors, width=640, height=480, frames=300, objects_per_color=1,
+                 min_size=30, max_size=90, seed=0):
+        self.colors = colors
+        self.width = width
+        self.height = height
+        self.frames = frames
+        self.objects_per_color = objects_per_color
+        self.min_size = min_size
+        self.max_size = max_size
+        self.seed = seed
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed)
+        W, H = self.width, self.height
+
+        # Grey noise stays far below the tracker's saturation threshold
+        background = np.clip(rng.normal(110, 8, (H, W, 1)) + rng.normal(0, 4, (H, W, 3)), 0, 255)
+        background = background.astype(np.uint8)
+
+        objects = []
+        for name in self.colors:
+            for _ in range(self.objects_per_color):
+                size = int(rng.integers(self.min_size, self.max_size + 1))
+                objects.append({
+                    'name': name,
+                    'size': size,
+                    'pos': rng.uniform([0, 0], [W - size, H - size]),
+                    'vel': rng.uniform(-6, 6, 2),
+                })
+
+        for _ in range(self.frames):
+            frame = background.copy()
+            truth = {name: [] for name in self.colors}
+
+            for obj in objects:
+                size = obj['size']
+                obj['pos'] += obj['vel']
+                for axis, limit in ((0, W - size), (1, H - size)):
+                    if not 0 <= obj['pos'][axis] <= limit:
+                        obj['vel'][axis] = -obj['vel'][axis]
+                        obj['pos'][axis] = np.clip(obj['pos'][axis], 0, limit)
+
+                x1, y1 = (int(v) for v in obj['pos'])
+                cv2.rectangle(frame, (x1, y1), (x1 + size - 1, y1 + size - 1), self.colors[obj['name']], -1)
+                truth[obj['name']].append((x1, y1, x1 + size, y1 + size))
+
+            yield frame, {name: np.asarray(boxes, dtype=np.int32).reshape(-1, 4) for name, boxes in truth.items()}
+
+
+def open_source(spec, colors=None, frames=300, width=640, height=480):
+    """
+    Opens a frame source from a spec string:
+    a camera index ('0'), 'synthetic', a video file, an image directory or a glob pattern.
+    """
+    if spec.isdigit():
+        return VideoSource(int(spec))
+    if spec == 'synthetic':
+        return SyntheticSource(colors, width=width, height=height, frames=frames)
+    if os.path.isdir(spec) or any(c in spec for c in '*?['):
+        return ImageSequenceSource(spec)
+    if os.path.isfile(spec):
+        return VideoSource(spec)
+    raise ValueError(f"Unknown frame source: {spec}")
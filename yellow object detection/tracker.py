@@ -0,0 +1,213 @@
+import numpy as np
+import cv2
+
+# Bitmask labels are stored in uint8, one bit per target colour
+MAX_COLORS = 8
+
+
+def bgr_to_hue(color):
+    c = np.uint8([[color]])
+    return int(cv2.cvtColor(c, cv2.COLOR_BGR2HSV)[0][0][0])
+
+
+class ColorTracker:
+    """
+    Classifies every pixel against several target colours in one pass.
+
+    Each colour is a box in HSV space (hue +/- hue_margin with wraparound at 180,
+    saturation and value ranges). All colours share the saturation and value
+    ranges, so that gate is a single inRange; hue goes through one lookup table
+    built at startup, and a pixel's label is its hue bitmask where the gate passes.
+    A single colour skips the table: one or two plain inRange calls (two when its
+    hue range wraps) give 0/255, which has its only bit set.
+    """
+
+    def __init__(self, colors, hue_margin=10, saturation=(100, 255), value=(100, 255)):
+        if not colors:
+            raise ValueError("At least one target colour is required")
+        if len(colors) > MAX_COLORS:
+            raise ValueError(f"At most {MAX_COLORS} colours can be tracked at once, got {len(colors)}")
+
+        self.names = list(colors)
+        self.bits = {name: 1 << i for i, name in enumerate(self.names)}
+
+        # 256-entry hue table: bit i is set for hues within colour i's margin
+        self._hue_lut = np.zeros(256, dtype=np.uint8)
+        for name, color in colors.items():
+            hue = bgr_to_hue(color)
+            hues = (hue + np.arange(-hue_margin, hue_margin + 1)) % 180
+            self._hue_lut[hues] |= self.bits[name]
+        self._gate_lower = (0, saturation[0], value[0])
+        self._gate_upper = (255, saturation[1], value[1])
+
+        self._single_ranges = None
+        if len(colors) == 1:
+            lo, hi = hue - hue_margin, hue + hue_margin
+            hue_ranges = [(lo, hi)] if 0 <= lo and hi <= 179 else [(0, hi % 180), (lo % 180, 179)]
+            self._single_ranges = [((h1, saturation[0], value[0]), (h2, saturation[1], value[1]))
+                                   for h1, h2 in hue_ranges]
+
+    def classify(self, frame):
+        """Returns a uint8 label image whose bit i is set where colour i matches"""
+        return self.classify_hsv(cv2.cvtColor(frame, cv2.COLOR_BGR2HSV))
+
+    def classify_hsv(self, hsv):
+        if self._single_ranges is not None:
+            labels = cv2.inRange(hsv, *self._single_ranges[0])
+            for lower, upper in self._single_ranges[1:]:
+                cv2.bitwise_or(labels, cv2.inRange(hsv, lower, upper), dst=labels)
+            return labels
+
+        gate = cv2.inRange(hsv, self._gate_lower, self._gate_upper)
+        hue = cv2.LUT(cv2.extractChannel(hsv, 0), self._hue_lut)
+        return cv2.bitwise_and(hue, gate, dst=hue)
+
+    def mask(self, labels, name):
+        """Extracts the 0/255 mask of one colour from a label image"""
+        # Two cheap passes, in place; a per-colour LUT costs several times more
+        mask = cv2.bitwise_and(labels, self.bits[name])
+        cv2.threshold(mask, 0, 255, cv2.THRESH_BINARY, dst=mask)
+        return mask
+
+    def masks(self, frame):
+        labels = self.classify(frame)
+        return {name: self.mask(labels, name) for name in self.names}
+
+    def detect(self, frame, min_area=100, open_size=0):
+        """Returns the blobs of every target colour, keyed by colour name"""
+        labels = self.classify(frame)
+        return {name: find_blobs(self.mask(labels, name), min_area=min_area, open_size=open_size)
+                for name in self.names}
+
+
+# One row per blob: exclusive box corners, pixel area and centroid
+BLOB_DTYPE = np.dtype([('x1', np.int32), ('y1', np.int32), ('x2', np.int32), ('y2', np.int32),
+                       ('area', np.int32), ('cx', np.float32), ('cy', np.float32)])
+
+
+def find_blobs(mask, min_area=100, open_size=0, connectivity=8):
+    """
+    Finds separate objects in a 0/255 mask with connected components.
+
+    Components smaller than min_area pixels are dropped. open_size > 0 applies a
+    morphological opening with a square kernel first to remove speckle noise.
+    Returns a BLOB_DTYPE array sorted by decreasing area.
+    """
+    if open_size > 0:
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (open_size, open_size))
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+
+    _, _, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=connectivity)
+
+    # Label 0 is the background
+    stats, centroids = stats[1:], centroids[1:]
+    keep = stats[:, cv2.CC_STAT_AREA] >= min_area
+    stats, centroids = stats[keep], centroids[keep]
+
+    blobs = np.empty(len(stats), dtype=BLOB_DTYPE)
+    blobs['x1'] = stats[:, cv2.CC_STAT_LEFT]
+    blobs['y1'] = stats[:, cv2.CC_STAT_TOP]
+    blobs['x2'] = stats[:, cv2.CC_STAT_LEFT] + stats[:, cv2.CC_STAT_WIDTH]
+    blobs['y2'] = stats[:, cv2.CC_STAT_TOP] + stats[:, cv2.CC_STAT_HEIGHT]
+    blobs['area'] = stats[:, cv2.CC_STAT_AREA]
+    blobs['cx'] = centroids[:, 0]
+    blobs['cy'] = centroids[:, 1]
+    return blobs[np.argsort(-blobs['area'], kind='stable')]
+
+
+def _offset_blobs(blobs, dx, dy, scale=1.0):
+    """Maps blobs from a window or scaled image back into full-frame coordinates"""
+    out = blobs.copy()
+    for key, delta in (('x1', dx), ('x2', dx), ('cx', dx), ('y1', dy), ('y2', dy), ('cy', dy)):
+        out[key] = blobs[key] / scale + delta
+    out['area'] = blobs['area'] / (scale * scale)
+    return out
+
+
+def _merge_windows(windows):
+    """Merges overlapping (x1, y1, x2, y2) windows so no pixel is classified twice"""
+    windows = list(windows)
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(windows)):
+            for j in range(i + 1, len(windows)):
+                a, b = windows[i], windows[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    windows[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                    del windows[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return windows
+
+
+class RoiSearch:
+    """
+    Tracks blobs by searching padded windows around the previous boxes.
+
+    Windows are classified at full resolution, so per-frame cost scales with
+    object size rather than frame size. A full-frame scan at reduced resolution
+    (scale) finds candidates every rescan_interval frames, when nothing is
+    tracked, or when a colour loses a blob; its boxes are then refined in
+    full-resolution windows within the same frame.
+    """
+
+    def __init__(self, tracker, min_area=100, open_size=0, padding=0.5, min_padding=16,
+                 scale=0.25, rescan_interval=30):
+        self.tracker = tracker
+        self.min_area = min_area
+        self.open_size = open_size
+        self.padding = padding
+        self.min_padding = min_padding
+        self.scale = scale
+        self.rescan_interval = rescan_interval
+
+        self.tracks = {}
+        self.frames_since_scan = 0
+
+    def detect(self, frame):
+        H, W = frame.shape[:2]
+        rescan = not any(len(b) for b in self.tracks.values()) or self.frames_since_scan >= self.rescan_interval
+
+        if not rescan:
+            results = self._search(frame, self._windows(self.tracks, W, H))
+            # A blob that left its window is re-acquired by a full scan
+            rescan = any(len(results[name]) < len(blobs) for name, blobs in self.tracks.items())
+
+        if rescan:
+            results = self._search(frame, self._windows(self._coarse_scan(frame), W, H))
+            self.frames_since_scan = 0
+        else:
+            self.frames_since_scan += 1
+
+        self.tracks = results
+        return results
+
+    def _coarse_scan(self, frame):
+        small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_NEAREST)
+        min_area = max(1, int(self.min_area * self.scale * self.scale))
+        found = self.tracker.detect(small, min_area=min_area)
+        return {name: _offset_blobs(blobs, 0, 0, self.scale) for name, blobs in found.items()}
+
+    def _windows(self, tracks, W, H):
+        windows = []
+        for blobs in tracks.values():
+            for x1, y1, x2, y2 in zip(blobs['x1'], blobs['y1'], blobs['x2'], blobs['y2']):
+                pad = max(self.min_padding, int(self.padding * max(x2 - x1, y2 - y1)))
+                windows.append((max(0, x1 - pad), max(0, y1 - pad), min(W, x2 + pad), min(H, y2 + pad)))
+        return _merge_windows(windows)
+
+    def _search(self, frame, windows):
+        found = {name: [] for name in self.tracker.names}
+        for x1, y1, x2, y2 in windows:
+            window = self.tracker.detect(frame[y1:y2, x1:x2], min_area=self.min_area, open_size=self.open_size)
+            for name, blobs in window.items():
+                found[name].append(_offset_blobs(blobs, x1, y1))
+
+        results = {}
+        for name, parts in found.items():
+            blobs = np.concatenate(parts) if parts else np.empty(0, dtype=BLOB_DTYPE)
+            results[name] = blobs[np.argsort(-blobs['area'], kind='stable')]
+        return results
@@ -10,4 +10,15 @@ def get_limits(color):
 
     lower = np.array(lower, dtype = np.uint8)
     upper = np.array(upper, dtype = np.uint8)
-    return lower, upper
\ No newline at end of file
+    return lower, upper
+
+# Named target colours in BGR
+COLORS = {
+    'yellow': [0, 255, 255],
+    'red': [0, 0, 255],
+    'green': [0, 255, 0],
+    'blue': [255, 0, 0],
+    'orange': [0, 165, 255],
+    'cyan': [255, 255, 0],
+    'magenta': [255, 0, 255],
+}